@@ -0,0 +1,4 @@
+from m3p0.api import apply, init
+from m3p0.app_config import ApplicationConfig
+
+__all__ = ["ApplicationConfig", "apply", "init"]
@@ -0,0 +1,126 @@
+import contextlib
+from typing import Iterator
+
+from psqlpy import ConnectionPool
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import FailCommandResult
+from m3p0.commands.init_cmd import InitCommand
+from m3p0.driver import M3P0Driver, PSQLPyM3P0Driver
+from m3p0.exceptions import CommandError
+
+
+async def init(
+    config: ApplicationConfig,
+    driver: M3P0Driver | None = None,
+    conn_pool: ConnectionPool | None = None,
+) -> str:
+    """Create m3p0 tables if they don't exist yet.
+
+    Already initialized databases get tables and indexes
+    added in the newer versions, so it can be awaited
+    on every start of the application before `apply`.
+
+    ### Parameters:
+    - `config`: application config.
+    - `driver`: driver to the database.
+    - `conn_pool`: `PSQLPy` connection pool, used if driver isn't passed.
+
+    ### Raises:
+    `CommandError` if database cannot be initialized.
+
+    ### Returns:
+    init report.
+    """
+    with _call_driver(
+        config=config,
+        driver=driver,
+        conn_pool=conn_pool,
+    ) as call_driver:
+        result = await InitCommand(config=config, driver=call_driver).run()
+
+    if isinstance(result, FailCommandResult):
+        raise CommandError(result.message)
+
+    return result.message
+
+
+async def apply(
+    config: ApplicationConfig,
+    driver: M3P0Driver | None = None,
+    conn_pool: ConnectionPool | None = None,
+    version: str | None = None,
+    force_no_version: bool = False,
+    lock_monitor: bool = False,
+    max_blocked_sessions: int | None = None,
+    max_blocked_ms: int | None = None,
+) -> str:
+    """Apply new migrations from the running application.
+
+    Must be awaited inside the running event loop,
+    it doesn't create neither event loop nor connection pool
+    if driver or pool is passed. Database must be initialized
+    with `init` first.
+
+    ### Parameters:
+    - `config`: application config.
+    - `driver`: driver to the database.
+    - `conn_pool`: `PSQLPy` connection pool, used if driver isn't passed.
+    - `version`: new version for the migrations.
+    - `force_no_version`: apply migrations without version.
+    - `lock_monitor`: cancel migration if it blocks other sessions.
+    - `max_blocked_sessions`: lock monitor threshold for sessions number.
+    - `max_blocked_ms`: lock monitor threshold for blocking time.
+
+    ### Raises:
+    `CommandError` if migrations cannot be applied.
+
+    ### Returns:
+    apply report.
+    """
+    with _call_driver(
+        config=config,
+        driver=driver,
+        conn_pool=conn_pool,
+    ) as call_driver:
+        result = await ApplyCommand(
+            config=config,
+            driver=call_driver,
+            version=version,
+            force_no_version=force_no_version,
+            lock_monitor=lock_monitor,
+            max_blocked_sessions=max_blocked_sessions,
+            max_blocked_ms=max_blocked_ms,
+        ).run()
+
+    if isinstance(result, FailCommandResult):
+        raise CommandError(result.message)
+
+    return result.message
+
+
+@contextlib.contextmanager
+def _call_driver(
+    config: ApplicationConfig,
+    driver: M3P0Driver | None,
+    conn_pool: ConnectionPool | None,
+) -> Iterator[M3P0Driver | None]:
+    """Driver for one API call.
+
+    Connection pool created here is closed after the call,
+    passed driver and pool belong to the application.
+    Custom driver from the config is built by the command.
+    """
+    if driver is not None:
+        yield driver
+    elif conn_pool is not None:
+        yield PSQLPyM3P0Driver(conn_pool=conn_pool)
+    elif config.driver:
+        yield None
+    else:
+        call_driver = PSQLPyM3P0Driver(config=config)
+        try:
+            yield call_driver
+        finally:
+            call_driver.conn_pool.close()
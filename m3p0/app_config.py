@@ -12,6 +12,9 @@ class ApplicationConfig:
     # Folder for migrations
     migration_path: str = "./migrations"
 
+    # Compiled migrations, used instead of migration_path if exists
+    bundle_path: str | None = None
+
     # Supported driver
     driver: str | None = None
 
@@ -19,23 +22,39 @@ class ApplicationConfig:
     postgres_url: str | None = None
     postgres_url_env: str | None = "M3P0_PSQL_URL"
 
+    # Maximum connections of the pool, must fit leader lock, migration,
+    # lock monitor and partition concurrency
+    pool_size: int = 10
+
+    # Seconds to wait for another process applying migrations
+    apply_lock_timeout: float = 600.0
+
+    # Lock monitor settings, thresholds are disabled if None
+    lock_monitor_interval_ms: int = 200
+    lock_monitor_max_blocked_sessions: int | None = None
+    lock_monitor_max_blocked_ms: int | None = None
+
     # Other custom settings
     datetime_format: str = "%d-%m-%Y_%H:%M:%S"
 
     @classmethod
-    def construct(cls: type["ApplicationConfig"]) -> "ApplicationConfig":
+    def construct(
+        cls: type["ApplicationConfig"],
+        path: str | None = None,
+    ) -> "ApplicationConfig":
         """Create new ApplicationConfig from pyproject.toml configuration.
 
+        ### Parameters:
+        - `path`: path to the pyproject.toml,
+            the one in the current directory by default.
+
         ### Returns:
         New `ApplicationConfig`.
         """
-        path = f"{os.getcwd()}/pyproject.toml"
+        path = path or f"{os.getcwd()}/pyproject.toml"
         with open(path, mode="rb") as pyproject:
             pyconfig = tomllib.load(pyproject)
 
         M3P0_config = pyconfig["tool"].get("m3p0")
 
         return ApplicationConfig(**M3P0_config if M3P0_config else {})
-
-
-application_config = ApplicationConfig.construct()
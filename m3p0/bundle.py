@@ -0,0 +1,249 @@
+import dataclasses
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Final, Self
+
+from m3p0.exceptions import BundleError
+from m3p0.models import Migration, MigrationSpec
+
+
+BUNDLE_MAGIC: Final = b"M3P0BNDL"
+BUNDLE_FORMAT_VERSION: Final = 1
+# magic, format version, index length.
+BUNDLE_HEADER: Final = struct.Struct("<8sHQ")
+# SHA256 of everything before it, stored at the end of the file.
+BUNDLE_DIGEST_SIZE: Final = 32
+
+
+@dataclasses.dataclass
+class BundledMigration(Migration):
+    """Migration which SQL files are stored in the bundle."""
+    bundle: "MigrationBundle"
+    files: dict[str, dict[str, Any]]
+
+    def read_sql(self, file_name: str) -> str:
+        """Read SQL file from the bundle.
+
+        File is read from the memory map only on this call
+        and checked against its checksum.
+
+        ### Parameters:
+        - `file_name`: name of the file, `apply.sql` for example.
+
+        ### Returns:
+        content of the file.
+        """
+        file_entry = self.files.get(file_name)
+        if file_entry is None:
+            raise FileNotFoundError(
+                f"There is no {file_name} for revision "
+                f"{self.spec.revision} in the bundle",
+            )
+
+        return self.bundle.read_file(file_entry)
+
+
+class MigrationBundle:
+    """Compiled migration chain stored in one file.
+
+    Layout of the file:
+    - header with magic, format version and index length;
+    - JSON index with specifications, file offsets and checksums
+      of the migrations, already sorted from the first to the head one;
+    - data section with content of the SQL files;
+    - SHA256 digest of the header, index and data section.
+    """
+
+    def __init__(self: Self, path: str) -> None:
+        """Open bundle and read its index.
+
+        ### Parameters:
+        - `path`: path to the bundle file.
+        """
+        self.path = path
+        with open(path, mode="rb") as bundle_file:
+            if os.fstat(bundle_file.fileno()).st_size < (
+                BUNDLE_HEADER.size + BUNDLE_DIGEST_SIZE
+            ):
+                raise BundleError(f"{path} is not a m3p0 bundle")
+
+            self.mmap = mmap.mmap(
+                bundle_file.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            )
+
+        magic, format_version, index_length = BUNDLE_HEADER.unpack_from(
+            self.mmap,
+        )
+        if magic != BUNDLE_MAGIC:
+            raise BundleError(f"{path} is not a m3p0 bundle")
+        if format_version != BUNDLE_FORMAT_VERSION:
+            raise BundleError(
+                f"Unsupported bundle format version {format_version}",
+            )
+
+        self.data_offset = BUNDLE_HEADER.size + index_length
+        self.digest_offset = len(self.mmap) - BUNDLE_DIGEST_SIZE
+        if self.data_offset > self.digest_offset:
+            raise BundleError(f"{path} is truncated")
+
+        try:
+            self.index = json.loads(
+                self.mmap[BUNDLE_HEADER.size:self.data_offset],
+            )
+        except ValueError as exc:
+            raise BundleError(f"{path} has corrupted index") from exc
+
+    @property
+    def migrations(self: Self) -> list[Migration]:
+        """Migrations sorted from the first to the head one."""
+        return [
+            BundledMigration(
+                spec=MigrationSpec(**migration["spec"]),
+                path=migration["path"],
+                bundle=self,
+                files=migration["files"],
+            )
+            for migration in self.index["migrations"]
+        ]
+
+    def read_file(self: Self, file_entry: dict[str, Any]) -> str:
+        """Read one file from the data section.
+
+        ### Parameters:
+        - `file_entry`: file entry from the index.
+
+        ### Returns:
+        content of the file.
+        """
+        start = self.data_offset + file_entry["offset"]
+        content = self.mmap[start:start + file_entry["length"]]
+        if hashlib.sha256(content).hexdigest() != file_entry["sha256"]:
+            raise BundleError(
+                f"Checksum mismatch in the bundle {self.path}",
+            )
+
+        return content.decode()
+
+    def verify(self: Self) -> None:
+        """Check integrity of the whole bundle, including its index."""
+        digest = hashlib.sha256(self.mmap[:self.digest_offset]).digest()
+        if digest != self.mmap[self.digest_offset:]:
+            raise BundleError(
+                f"Checksum mismatch in the bundle {self.path}",
+            )
+
+    def compare(self: Self, migrations: list[Migration]) -> list[str]:
+        """Compare bundle with migrations from the directory.
+
+        Specifications and SHA256 of every SQL file are compared,
+        so edited SQL of the existing revision is found too.
+
+        ### Parameters:
+        - `migrations`: migrations from the directory,
+            sorted from the first to the head one.
+
+        ### Returns:
+        list of human-readable differences, empty if bundle is up to date.
+        """
+        differences: list[str] = []
+        bundled_migrations = {
+            migration["spec"]["revision"]: migration
+            for migration in self.index["migrations"]
+        }
+        local_revisions = [migration.spec.revision for migration in migrations]
+        if local_revisions != list(bundled_migrations):
+            differences.append("order of revisions differs")
+
+        for migration in migrations:
+            revision = migration.spec.revision
+            bundled_migration = bundled_migrations.get(revision)
+            if bundled_migration is None:
+                differences.append(f"- {revision} is missing in the bundle")
+                continue
+
+            if MigrationSpec(**bundled_migration["spec"]) != migration.spec:
+                differences.append(f"~ {revision} specification differs")
+
+            local_files = {
+                sql_path.name: hashlib.sha256(sql_path.read_bytes()).hexdigest()
+                for sql_path in Path(migration.path).glob("*.sql")
+            }
+            bundled_files = {
+                file_name: file_entry["sha256"]
+                for file_name, file_entry in bundled_migration["files"].items()
+            }
+            differences.extend(
+                f"~ {revision} {file_name} differs"
+                for file_name in sorted(local_files.keys() | bundled_files.keys())
+                if local_files.get(file_name) != bundled_files.get(file_name)
+            )
+
+        differences.extend(
+            f"+ {revision} is only in the bundle"
+            for revision in bundled_migrations
+            if revision not in local_revisions
+        )
+        return differences
+
+    def close(self: Self) -> None:
+        """Close memory map of the bundle."""
+        self.mmap.close()
+
+
+def build_bundle(migrations: list[Migration], output_path: str) -> int:
+    """Compile migrations into one bundle file.
+
+    ### Parameters:
+    - `migrations`: migrations sorted from the first to the head one.
+    - `output_path`: path to the new bundle file.
+
+    ### Returns:
+    number of bundled migrations.
+    """
+    data = bytearray()
+    index_migrations = []
+
+    for migration in migrations:
+        files = {}
+        for sql_path in sorted(Path(migration.path).glob("*.sql")):
+            content = sql_path.read_bytes()
+            files[sql_path.name] = {
+                "offset": len(data),
+                "length": len(content),
+                "sha256": hashlib.sha256(content).hexdigest(),
+            }
+            data += content
+
+        index_migrations.append(
+            {
+                "path": migration.path,
+                "spec": dataclasses.asdict(migration.spec),
+                "files": files,
+            },
+        )
+
+    index = json.dumps({"migrations": index_migrations}).encode()
+    header = BUNDLE_HEADER.pack(
+        BUNDLE_MAGIC,
+        BUNDLE_FORMAT_VERSION,
+        len(index),
+    )
+    digest = hashlib.sha256(header + index + data).digest()
+
+    # Write to the temporary file first,
+    # so readers never see half-written bundle.
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, mode="wb") as bundle_file:
+        bundle_file.write(header)
+        bundle_file.write(index)
+        bundle_file.write(data)
+        bundle_file.write(digest)
+    os.replace(temporary_path, output_path)
+
+    return len(index_migrations)
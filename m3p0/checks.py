@@ -1,13 +1,13 @@
-
-
+from m3p0.app_config import ApplicationConfig
 from m3p0.driver import M3P0Driver
 from m3p0.utils import database_revision_history, migrations_revision_history
 
 
 async def check_migration_history(
+    config: ApplicationConfig,
     driver: M3P0Driver,
 ) -> tuple[bool, str]:
-    local_revisions_history = migrations_revision_history()
+    local_revisions_history = migrations_revision_history(config=config)
     database_revisions_history = await database_revision_history(
         driver=driver,
     )
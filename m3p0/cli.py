@@ -6,12 +6,18 @@ import typer
 
 from m3p0.app_config import ApplicationConfig
 from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import FailCommandResult
+from m3p0.commands.bundle_cmd import BundleCommand, VerifyBundleCommand
 from m3p0.commands.check_cmd import CheckCommand
 from m3p0.commands.create_cmd import CreateCommand
 from m3p0.commands.init_cmd import InitCommand
+from m3p0.commands.schema_cmd import SchemaDiffCommand, SchemaSnapshotCommand
+from m3p0.commands.watch_cmd import WatchCommand
 
 
 app = typer.Typer()
+schema_app = typer.Typer(help="Database schema snapshots.")
+app.add_typer(schema_app, name="schema")
 
 
 @app.command()
@@ -20,7 +26,9 @@ def init() -> None:
     
     It must be done once at the start.
     """
-    result = asyncio.run(InitCommand().execute_cmd())
+    result = asyncio.run(
+        InitCommand(config=ApplicationConfig.construct()).run(),
+    )
     result.print_info()
 
 
@@ -31,7 +39,9 @@ def check_history() -> None:
 
     Local history and database history must be the same.
     """
-    result = asyncio.run(CheckCommand().execute_cmd())
+    result = asyncio.run(
+        CheckCommand(config=ApplicationConfig.construct()).run(),
+    )
     result.print_info()
 
 
@@ -52,6 +62,27 @@ def apply(
             ),
         ),
     ] = False,
+    lock_monitor: Annotated[
+        bool,
+        typer.Option(
+            help=(
+                "Watch sessions blocked by the migration "
+                "and cancel it when thresholds are exceeded."
+            ),
+        ),
+    ] = False,
+    max_blocked_sessions: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Cancel migration if it blocks more sessions.",
+        ),
+    ] = None,
+    max_blocked_ms: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Cancel migration if it blocks a session longer.",
+        ),
+    ] = None,
 ) -> None:
     """Apply new migration."""
     if not version and not force_no_version:
@@ -61,11 +92,18 @@ def apply(
         )
     result = asyncio.run(
         ApplyCommand(
+            config=ApplicationConfig.construct(),
             version=version,
             force_no_version=force_no_version,
-        ).execute_cmd()
+            lock_monitor=lock_monitor,
+            max_blocked_sessions=max_blocked_sessions,
+            max_blocked_ms=max_blocked_ms,
+        ).run()
     )
     result.print_info()
+    # Deploy orchestrators rely on the exit code.
+    if isinstance(result, FailCommandResult):
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -100,12 +138,115 @@ def create(
     """Create new migration."""
     result = asyncio.run(
         CreateCommand(
+            config=ApplicationConfig.construct(),
             migration_name=name,
             apply_in_transaction=apply_in_transaction,
             rollback_in_transaction=rollback_in_transaction,
-        ).execute_cmd()
+        ).run()
     )
         
 
+@app.command()
+def bundle(
+    output: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Path to the bundle file, bundle_path from config by default.",
+        ),
+    ] = None,
+) -> None:
+    """Compile all migrations into one bundle file for deployment."""
+    config = ApplicationConfig.construct()
+    output_path = output or config.bundle_path
+    if not output_path:
+        print("output parameter or bundle_path config must be specified")
+        raise typer.Exit(code=1)
+
+    # Bundle commands don't need the database, so driver isn't retrieved.
+    result = asyncio.run(
+        BundleCommand(config=config, output_path=output_path).execute_cmd(),
+    )
+    result.print_info()
+
+
+@app.command()
+def verify_bundle(
+    bundle_path: Annotated[
+        Optional[str],
+        typer.Argument(
+            help="Path to the bundle file, bundle_path from config by default.",
+        ),
+    ] = None,
+) -> None:
+    """Check integrity of the bundle file."""
+    config = ApplicationConfig.construct()
+    bundle_path = bundle_path or config.bundle_path
+    if not bundle_path:
+        print("bundle path or bundle_path config must be specified")
+        raise typer.Exit(code=1)
+
+    result = asyncio.run(
+        VerifyBundleCommand(
+            config=config,
+            bundle_path=bundle_path,
+        ).execute_cmd(),
+    )
+    result.print_info()
+    if isinstance(result, FailCommandResult):
+        raise typer.Exit(code=1)
+
+
+@schema_app.command("snapshot")
+def schema_snapshot() -> None:
+    """Save database schema alongside the head migration."""
+    result = asyncio.run(
+        SchemaSnapshotCommand(config=ApplicationConfig.construct()).run(),
+    )
+    result.print_info()
+
+
+@schema_app.command("diff")
+def schema_diff() -> None:
+    """Compare database schema with the snapshot of the head migration."""
+    result = asyncio.run(
+        SchemaDiffCommand(config=ApplicationConfig.construct()).run(),
+    )
+    result.print_info()
+
+
+@app.command()
+def watch(
+    head_applied: Annotated[
+        bool,
+        typer.Option(
+            help="Head migration is already applied to the database.",
+        ),
+    ] = True,
+    poll_interval: Annotated[
+        float,
+        typer.Option(
+            help=(
+                "Interval in seconds to check migration files. "
+                "Used only if inotify is unavailable."
+            ),
+        ),
+    ] = 0.5,
+) -> None:
+    """Re-apply the head migration every time it changes.
+
+    Only for local development.
+    """
+    try:
+        asyncio.run(
+            WatchCommand(
+                config=ApplicationConfig.construct(),
+                head_applied=head_applied,
+                poll_interval=poll_interval,
+            ).run()
+        )
+    except KeyboardInterrupt:
+        print("Watch mode stopped.")
+
+
 if __name__ == "__main__":
     app()
@@ -1,7 +1,42 @@
+import asyncio
+import contextlib
+import hashlib
+import time
+from uuid import UUID
 
-from m3p0.commands.base import BaseCommandResult, Command, SuccessCommandResult
-from m3p0.queries import IS_VERSION_ALREADY_EXIST
-from m3p0.utils import database_revision_history, migrations_revision_history
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.base import BaseCommandResult, Command, FailCommandResult, SuccessCommandResult
+from m3p0.consts import (
+    LOCK_WAIT_INITIAL_DELAY,
+    LOCK_WAIT_MAX_DELAY,
+    MIGRATIONS_LOCK_NAME,
+    PARTITION_PLACEHOLDER,
+)
+from m3p0.driver import (
+    M3P0Driver,
+    M3P0LockingDriver,
+    M3P0RecordingDriver,
+    M3P0SessionDriver,
+    driver_session,
+)
+from m3p0.exceptions import CommandError
+from m3p0.models import Migration, PartitionedSpec
+from m3p0.monitor import LockMonitor, migration_tag
+from m3p0.queries import (
+    DELETE_COMPLETED_PARTITIONS,
+    DELETE_COMPLETED_STATEMENTS,
+    INSERT_APPLIED_MIGRATION,
+    INSERT_COMPLETED_PARTITION,
+    INSERT_COMPLETED_STATEMENT,
+    IS_REVISION_APPLIED,
+    IS_VERSION_ALREADY_EXIST,
+    RESET_SESSION_SETTINGS,
+    RETRIEVE_COMPLETED_PARTITIONS,
+    RETRIEVE_COMPLETED_STATEMENTS,
+    RETRIEVE_LEAF_PARTITIONS,
+)
+from m3p0.sql import Statement, split_statements
+from m3p0.utils import database_revision_history, sorted_migrations
 
 
 class ApplyCommand(Command):
@@ -9,35 +44,506 @@ class ApplyCommand(Command):
 
     def __init__(
         self,
+        config: ApplicationConfig,
         version: str | None,
-        force_no_version: bool
+        force_no_version: bool,
+        lock_monitor: bool = False,
+        max_blocked_sessions: int | None = None,
+        max_blocked_ms: int | None = None,
+        driver: M3P0Driver | None = None,
     ) -> None:
-        if not version and not force_no_version:
-            print(
-                "version parameter must be specified, "
-                "or set force_no_version",
-            )
+        super().__init__(config=config, driver=driver)
         self.version = version
         self.force_no_version = force_no_version
+        self.lock_monitor = lock_monitor
+        self.max_blocked_sessions = (
+            max_blocked_sessions
+            if max_blocked_sessions is not None
+            else config.lock_monitor_max_blocked_sessions
+        )
+        self.max_blocked_ms = (
+            max_blocked_ms
+            if max_blocked_ms is not None
+            else config.lock_monitor_max_blocked_ms
+        )
 
     async def execute_cmd(self) -> BaseCommandResult:
+        if not self.version and not self.force_no_version:
+            return FailCommandResult(
+                "version parameter must be specified, "
+                "or set force_no_version",
+            )
+
+        migrations = sorted_migrations(config=self.config)
+        if not migrations or await self.is_revision_applied(
+            migrations[-1].spec.revision,
+        ):
+            return SuccessCommandResult(
+                "There is no migrations to apply! Have fun!",
+            )
+
+        if (
+            isinstance(self.driver, M3P0SessionDriver)
+            and self.driver.max_sessions() < self.reserved_sessions() + 1
+        ):
+            return FailCommandResult(
+                f"Connection pool has {self.driver.max_sessions()} "
+                f"connections, apply needs at least "
+                f"{self.reserved_sessions() + 1} for the leader lock, "
+                "lock monitor and migration. Increase pool_size",
+            )
+
+        if not isinstance(self.driver, M3P0LockingDriver):
+            return await self.apply_migrations(migrations=migrations)
+
+        return await self.apply_as_leader_or_wait(
+            driver=self.driver,
+            migrations=migrations,
+        )
+
+    def reserved_sessions(self) -> int:
+        """Number of connections held during the whole apply.
+
+        Leader lock and lock monitor hold their own connections,
+        migration can use only the rest of the pool.
+        """
+        return (
+            int(isinstance(self.driver, M3P0LockingDriver))
+            + int(self.lock_monitor)
+        )
+
+    async def apply_as_leader_or_wait(
+        self,
+        driver: M3P0LockingDriver,
+        migrations: list[Migration],
+    ) -> BaseCommandResult:
+        """Apply migrations only in the process holding advisory lock.
+
+        Other processes poll the head revision with backoff
+        and succeed as soon as it's applied. If the lock is released
+        but the head isn't applied, the next process takes the lock
+        and applies migrations itself.
+
+        ### Parameters:
+        - `driver`: driver supporting advisory locks.
+        - `migrations`: all local migrations.
+        """
+        head_revision = migrations[-1].spec.revision
+        deadline = time.monotonic() + self.config.apply_lock_timeout
+        delay = LOCK_WAIT_INITIAL_DELAY
+
+        while True:
+            async with driver.try_advisory_lock(
+                lock_name=MIGRATIONS_LOCK_NAME,
+            ) as is_leader:
+                if is_leader:
+                    if await self.is_revision_applied(head_revision):
+                        return SuccessCommandResult(
+                            f"Head revision {head_revision} "
+                            "is applied by another process",
+                        )
+                    return await self.apply_migrations(migrations=migrations)
+
+            if await self.is_revision_applied(head_revision):
+                return SuccessCommandResult(
+                    f"Head revision {head_revision} "
+                    "is applied by another process",
+                )
+
+            if time.monotonic() >= deadline:
+                return FailCommandResult(
+                    f"Timed out waiting for head revision {head_revision} "
+                    "to be applied by another process",
+                )
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LOCK_WAIT_MAX_DELAY)
+
+    async def apply_migrations(
+        self,
+        migrations: list[Migration],
+    ) -> BaseCommandResult:
+        """Apply all migrations not presented in the database.
+
+        ### Parameters:
+        - `migrations`: all local migrations.
+        """
+        if self.version and await self.is_version_exists():
+            return FailCommandResult(
+                f"Version {self.version} already exists",
+            )
+
+        database_revisions = set(
+            await database_revision_history(self.driver),
+        )
         to_run_migrations = [
             migration for migration
-            in migrations_revision_history()
-            if migration not in await database_revision_history(self.driver)
+            in migrations
+            if migration.spec.revision not in database_revisions
         ]
 
         if not to_run_migrations:
             return SuccessCommandResult(
                 "There is no migrations to apply! Have fun!",
             )
-        
-        print(to_run_migrations)
 
-        return SuccessCommandResult(
-            "123",
+        apply_report: list[str] = []
+        for migration in to_run_migrations:
+            try:
+                apply_report.append(
+                    await self.apply_migration(migration=migration),
+                )
+            except Exception as exc:
+                apply_report.append(
+                    f"Cannot apply migration {migration.spec.revision}: {exc}",
+                )
+                return FailCommandResult("\n".join(apply_report))
+
+        apply_report.append(f"{len(to_run_migrations)} migrations applied")
+        return SuccessCommandResult("\n".join(apply_report))
+
+    async def apply_migration(self, migration: Migration) -> str:
+        """Apply one migration and record it in the database.
+
+        ### Parameters:
+        - `migration`: migration to apply.
+
+        ### Returns:
+        report about the migration.
+        """
+        spec = migration.spec
+        revision = UUID(spec.revision)
+        apply_sql = migration.read_sql("apply.sql")
+        tag = migration_tag(spec.revision)
+        lock_monitor = self.build_lock_monitor(tag=tag)
+
+        start_time = time.perf_counter()
+        try:
+            async with lock_monitor or contextlib.nullcontext():
+                if spec.apply_in_transaction:
+                    await self.apply_in_transaction(
+                        revision=revision,
+                        apply_sql=apply_sql,
+                        tag=tag,
+                        # Partitions can fail after apply.sql is committed,
+                        # so it must not be executed again on rerun.
+                        checkpoint=spec.partitioned is not None,
+                    )
+                else:
+                    await self.apply_statements(
+                        revision=revision,
+                        apply_sql=apply_sql,
+                        tag=tag,
+                    )
+
+                if spec.partitioned:
+                    await self.apply_partitions(
+                        migration=migration,
+                        partitioned=spec.partitioned,
+                        revision=revision,
+                        tag=tag,
+                    )
+        except Exception as exc:
+            if lock_monitor and lock_monitor.report.cancel_reason:
+                raise CommandError(lock_monitor.report.summary()) from exc
+            raise
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        # Transactional migration without partitions
+        # is recorded in its own transaction.
+        if not spec.apply_in_transaction or spec.partitioned:
+            await self.driver.execute(
+                querystring=INSERT_APPLIED_MIGRATION,
+                parameters=[self.version, revision],
+            )
+
+        if not spec.apply_in_transaction or spec.partitioned:
+            await self.driver.execute(
+                querystring=DELETE_COMPLETED_STATEMENTS,
+                parameters=[revision],
+            )
+        if spec.partitioned:
+            await self.driver.execute(
+                querystring=DELETE_COMPLETED_PARTITIONS,
+                parameters=[revision],
+            )
+
+        migration_report = (
+            f"{migration.spec.revision} applied in {elapsed_ms:.1f} ms"
+        )
+        if lock_monitor:
+            migration_report += f"\n{lock_monitor.report.summary()}"
+        return migration_report
+
+    def build_lock_monitor(self, tag: str) -> LockMonitor | None:
+        """Build lock monitor for the migration if it's enabled.
+
+        ### Parameters:
+        - `tag`: tag of the migration.
+        """
+        if not self.lock_monitor:
+            return None
+
+        return LockMonitor(
+            driver=self.driver,
+            tag=tag,
+            interval_ms=self.config.lock_monitor_interval_ms,
+            max_blocked_sessions=self.max_blocked_sessions,
+            max_blocked_ms=self.max_blocked_ms,
         )
-    
+
+    async def apply_statements(
+        self,
+        revision: UUID,
+        apply_sql: str,
+        tag: str,
+    ) -> None:
+        """Apply migration statement by statement outside a transaction.
+
+        All statements are executed on one connection, so session
+        settings like `SET lock_timeout` apply to the following ones.
+        Every completed statement is recorded with its offset and hash,
+        so after a failure the next apply resumes
+        from the first incomplete statement. Completed `SET` and `RESET`
+        are executed again, session settings don't survive the connection.
+
+        ### Parameters:
+        - `revision`: revision of the migration.
+        - `apply_sql`: content of the `apply.sql`.
+        - `tag`: tag of the migration, added to every statement.
+        """
+        completed_statements = await self.retrieve_completed_statements(
+            revision=revision,
+        )
+        statements = split_statements(apply_sql)
+
+        async with driver_session(self.driver) as session:
+            try:
+                for statement in statements:
+                    if (
+                        (statement.offset, statement.checksum)
+                        in completed_statements
+                        and not statement.is_session_setting
+                    ):
+                        continue
+
+                    try:
+                        await session.execute_migration(
+                            querystring=f"{tag}\n{statement.text}",
+                            in_transaction=False,
+                        )
+                    except Exception as exc:
+                        raise CommandError(
+                            f"Statement at offset {statement.offset} "
+                            f"failed: {exc}\n"
+                            "Previous statements are completed and "
+                            "will be skipped on the next apply",
+                        ) from exc
+
+                    await session.execute(
+                        querystring=INSERT_COMPLETED_STATEMENT,
+                        parameters=[
+                            revision,
+                            statement.offset,
+                            statement.checksum,
+                        ],
+                    )
+            finally:
+                # Connection goes back to the pool,
+                # settings of the migration must not leak to other queries.
+                if any(statement.is_session_setting for statement in statements):
+                    await session.execute(querystring=RESET_SESSION_SETTINGS)
+
+    async def apply_in_transaction(
+        self,
+        revision: UUID,
+        apply_sql: str,
+        tag: str,
+        checkpoint: bool,
+    ) -> None:
+        """Apply whole migration in one transaction.
+
+        Migration is recorded as applied in the same transaction.
+
+        ### Parameters:
+        - `revision`: revision of the migration.
+        - `apply_sql`: content of the `apply.sql`.
+        - `tag`: tag of the migration.
+        - `checkpoint`: record completion as one statement instead
+            of the applied migration and skip the migration
+            if it's already completed.
+        """
+        whole_migration = Statement(offset=0, text=apply_sql)
+        if checkpoint:
+            completed_statements = await self.retrieve_completed_statements(
+                revision=revision,
+            )
+            if (0, whole_migration.checksum) in completed_statements:
+                return
+
+        if checkpoint:
+            record_querystring = INSERT_COMPLETED_STATEMENT
+            record_parameters = [revision, 0, whole_migration.checksum]
+        else:
+            record_querystring = INSERT_APPLIED_MIGRATION
+            record_parameters = [self.version, revision]
+
+        if isinstance(self.driver, M3P0RecordingDriver):
+            await self.driver.execute_migration_and_record(
+                querystring=f"{tag}\n{apply_sql}",
+                record_querystring=record_querystring,
+                record_parameters=record_parameters,
+            )
+            return
+
+        await self.driver.execute_migration(
+            querystring=f"{tag}\n{apply_sql}",
+            in_transaction=True,
+        )
+        await self.driver.execute(
+            querystring=record_querystring,
+            parameters=record_parameters,
+        )
+
+    async def apply_partitions(
+        self,
+        migration: Migration,
+        partitioned: PartitionedSpec,
+        revision: UUID,
+        tag: str,
+    ) -> None:
+        """Apply partition template to every leaf partition in parallel.
+
+        Partitions are retrieved with one catalog query, template
+        is executed on at most `concurrency` connections at once,
+        but not on more than the pool has left after the leader lock
+        and lock monitor.
+        Completed partitions are recorded and skipped on rerun,
+        finalize file is executed after all partitions.
+
+        ### Parameters:
+        - `migration`: migration to apply.
+        - `partitioned`: partitioned part of the specification.
+        - `revision`: revision of the migration.
+        - `tag`: tag of the migration, added to every query.
+        """
+        template = migration.read_sql(partitioned.template_file)
+        if PARTITION_PLACEHOLDER not in template:
+            raise CommandError(
+                f"{partitioned.template_file} must contain "
+                f"{PARTITION_PLACEHOLDER} placeholder",
+            )
+        template_hash = hashlib.sha256(template.encode()).hexdigest()
+
+        partition_records = await self.driver.fetch(
+            querystring=RETRIEVE_LEAF_PARTITIONS,
+            parameters=[partitioned.parent_table],
+        )
+        completed_records = await self.driver.fetch(
+            querystring=RETRIEVE_COMPLETED_PARTITIONS,
+            parameters=[revision, template_hash],
+        )
+        completed_partitions = {
+            record["partition_name"] for record in completed_records or []
+        }
+
+        concurrency = partitioned.concurrency
+        if isinstance(self.driver, M3P0SessionDriver):
+            # Every partition holds one connection,
+            # more partitions than free connections only wait for the pool.
+            concurrency = min(
+                concurrency,
+                self.driver.max_sessions() - self.reserved_sessions(),
+            )
+        semaphore = asyncio.Semaphore(concurrency)
+        is_failed = False
+
+        async def apply_partition(partition_name: str) -> None:
+            nonlocal is_failed
+            async with semaphore, driver_session(self.driver) as session:
+                # Don't start new partitions after a failure,
+                # already started ones are finished and recorded.
+                if is_failed:
+                    return
+
+                try:
+                    await session.execute_migration(
+                        querystring=(
+                            f"{tag}\n"
+                            + template.replace(
+                                PARTITION_PLACEHOLDER,
+                                partition_name,
+                            )
+                        ),
+                        in_transaction=partitioned.in_transaction,
+                    )
+                except Exception as exc:
+                    is_failed = True
+                    raise CommandError(
+                        f"Partition {partition_name} failed: {exc}",
+                    ) from exc
+
+                await session.execute(
+                    querystring=INSERT_COMPLETED_PARTITION,
+                    parameters=[revision, partition_name, template_hash],
+                )
+
+        results = await asyncio.gather(
+            *(
+                apply_partition(record["partition_name"])
+                for record in partition_records or []
+                if record["partition_name"] not in completed_partitions
+            ),
+            return_exceptions=True,
+        )
+        errors = [
+            result for result in results
+            if isinstance(result, BaseException)
+        ]
+        if errors:
+            raise CommandError(
+                f"{errors[0]}\n"
+                "Completed partitions will be skipped on the next apply",
+            ) from errors[0]
+
+        if partitioned.finalize_file:
+            await self.driver.execute_migration(
+                querystring=(
+                    f"{tag}\n"
+                    + migration.read_sql(partitioned.finalize_file)
+                ),
+                in_transaction=partitioned.in_transaction,
+            )
+
+    async def retrieve_completed_statements(
+        self,
+        revision: UUID,
+    ) -> set[tuple[int, str]]:
+        """Retrieve offsets and hashes of completed statements.
+
+        ### Parameters:
+        - `revision`: revision of the migration.
+        """
+        completed_records = await self.driver.fetch(
+            querystring=RETRIEVE_COMPLETED_STATEMENTS,
+            parameters=[revision],
+        )
+        return {
+            (record["statement_offset"], record["statement_hash"])
+            for record in completed_records or []
+        }
+
+    async def is_revision_applied(self, revision: str) -> bool:
+        """Check is revision applied with one indexed lookup.
+
+        ### Parameters:
+        - `revision`: revision to check.
+        """
+        return await self.driver.exists(
+            querystring=IS_REVISION_APPLIED,
+            parameters=[UUID(revision)],
+        )
+
     async def is_version_exists(self) -> bool:
         return await self.driver.exists(
             querystring=IS_VERSION_ALREADY_EXIST,
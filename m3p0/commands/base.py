@@ -3,6 +3,9 @@ import enum
 from typing import Self
 from colorama import Fore
 
+from m3p0.app_config import ApplicationConfig
+from m3p0.driver import M3P0Driver
+from m3p0.exceptions import CommandError
 from m3p0.utils import retrieve_driver
 
 
@@ -36,7 +39,35 @@ class FailCommandResult(BaseCommandResult):
 class Command(abc.ABC):
     """Protocol for every command available."""
 
-    driver = retrieve_driver()
+    def __init__(
+        self: Self,
+        config: ApplicationConfig,
+        driver: M3P0Driver | None = None,
+    ) -> None:
+        """Initialize the command.
+
+        ### Parameters:
+        - `config`: application config.
+        - `driver`: driver to the database, if not passed
+            it's retrieved from the config in `run`.
+        """
+        self.config = config
+        self._driver = driver
+
+    @property
+    def driver(self: Self) -> M3P0Driver:
+        """Driver to the database."""
+        if self._driver is None:
+            raise CommandError(
+                "Driver is not initialized, execute command with `run`",
+            )
+        return self._driver
+
+    async def run(self: Self) -> BaseCommandResult:
+        """Retrieve driver if necessary and execute command."""
+        if self._driver is None:
+            self._driver = await retrieve_driver(config=self.config)
+        return await self.execute_cmd()
 
     @abc.abstractmethod
     async def execute_cmd(self) -> BaseCommandResult:
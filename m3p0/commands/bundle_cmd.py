@@ -0,0 +1,71 @@
+import os
+from typing import Self
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.bundle import MigrationBundle, build_bundle
+from m3p0.commands.base import BaseCommandResult, Command, FailCommandResult, SuccessCommandResult
+from m3p0.exceptions import BundleError
+from m3p0.utils import directory_migrations
+
+
+class BundleCommand(Command):
+    """Command compiles migrations into one bundle file."""
+
+    def __init__(self: Self, config: ApplicationConfig, output_path: str) -> None:
+        """Initialize the bundle command.
+
+        ### Parameters:
+        - `output_path`: path to the new bundle file.
+        """
+        super().__init__(config=config)
+        self.output_path = output_path
+
+    async def execute_cmd(self: Self) -> BaseCommandResult:
+        migrations_number = build_bundle(
+            migrations=directory_migrations(config=self.config),
+            output_path=self.output_path,
+        )
+
+        return SuccessCommandResult(
+            f"{migrations_number} migrations bundled into {self.output_path}",
+        )
+
+
+class VerifyBundleCommand(Command):
+    """Command checks integrity of the bundle file.
+
+    If migration directory exists, bundle must also be up to date with it.
+    """
+
+    def __init__(self: Self, config: ApplicationConfig, bundle_path: str) -> None:
+        """Initialize the verify bundle command.
+
+        ### Parameters:
+        - `bundle_path`: path to the bundle file.
+        """
+        super().__init__(config=config)
+        self.bundle_path = bundle_path
+
+    async def execute_cmd(self: Self) -> BaseCommandResult:
+        try:
+            bundle = MigrationBundle(path=self.bundle_path)
+            try:
+                bundle.verify()
+                differences = (
+                    bundle.compare(directory_migrations(config=self.config))
+                    if os.path.isdir(self.config.migration_path)
+                    else []
+                )
+            finally:
+                bundle.close()
+        except BundleError as exc:
+            return FailCommandResult(str(exc))
+
+        if differences:
+            return FailCommandResult(
+                f"Bundle {self.bundle_path} is stale, "
+                "rebuild it with the bundle command:\n"
+                + "\n".join(differences),
+            )
+
+        return SuccessCommandResult(f"Bundle {self.bundle_path} is valid")
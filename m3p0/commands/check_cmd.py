@@ -7,6 +7,7 @@ class CheckCommand(Command):
 
     async def execute_cmd(self) -> BaseCommandResult:
         result, message = await check_migration_history(
+            config=self.config,
             driver=self.driver,
         )
 
@@ -10,7 +10,7 @@ import uuid
 from m3p0.commands.base import BaseCommandResult, Command, SuccessCommandResult
 from m3p0.consts import MAX_MIGRATION_NAME_LENGTH
 from m3p0.exceptions import CommandError
-from m3p0.app_config import application_config
+from m3p0.app_config import ApplicationConfig
 from m3p0.queries import RETRIEVE_LAST_REVISION
 from m3p0.utils import migrations_revision_history
 
@@ -20,16 +20,21 @@ class CreateCommand(Command):
 
     def __init__(
         self: Self,
+        config: ApplicationConfig,
         migration_name: str,
         apply_in_transaction: bool,
         rollback_in_transaction: bool,
     ) -> None:
         """Initialize the create command."""
+        super().__init__(config=config)
         self.migration_name = migration_name
         self.apply_in_transaction = apply_in_transaction
         self.rollback_in_transaction = rollback_in_transaction
         self.revision = uuid.uuid4().hex
-        self.migrations_revision_history = migrations_revision_history()
+        self.migrations_revision_history = migrations_revision_history(
+            config=config,
+            from_directory=True,
+        )
 
     async def execute_cmd(self: Self) -> BaseCommandResult:
         await self.build_new_migration()
@@ -73,7 +78,7 @@ class CreateCommand(Command):
     def create_new_migration_folder(self) -> str:
         migration_path_name = self.create_migration_folder_name()
         migration_path = (
-            f"{application_config.migration_path}"
+            f"{self.config.migration_path}"
             f"/{migration_path_name}"
         )
         try:
@@ -87,7 +92,7 @@ class CreateCommand(Command):
     
     def create_migration_folder_name(self) -> str:
         now_time = datetime.datetime.now().strftime(
-            application_config.datetime_format,
+            self.config.datetime_format,
         )
         migration_name = f"{now_time}_{self.migration_name}"
         return migration_name[:MAX_MIGRATION_NAME_LENGTH]
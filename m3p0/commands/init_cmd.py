@@ -1,19 +1,22 @@
 from typing import Self
 from m3p0.commands.base import Command, BaseCommandResult, SuccessCommandResult, FailCommandResult
 from m3p0.exceptions import CommandError
-from m3p0.queries import CREATE_TABLE_QUERY, IS_TABLE_EXISTS_QUERY
-from m3p0.utils import retrieve_driver
+from m3p0.queries import (
+    CREATE_PARTITION_PROGRESS_TABLE_QUERY,
+    CREATE_REVISION_INDEX_QUERY,
+    CREATE_STATEMENT_PROGRESS_TABLE_QUERY,
+    CREATE_TABLE_QUERY,
+    IS_TABLE_EXISTS_QUERY,
+)
 
 
 class InitCommand(Command):
     """Command to initialize the M3P0 migration system."""
 
-    def __init__(self) -> None:
-        self.driver = retrieve_driver()
-
     async def execute_cmd(self: Self) -> BaseCommandResult:
         is_migration_table_exist = await self.is_already_init()
         if is_migration_table_exist:
+            await self.create_auxiliary_tables()
             return SuccessCommandResult(
                 message="m3p0 is already initialized",
             )
@@ -32,9 +35,26 @@ class InitCommand(Command):
             await self.driver.execute(
                 querystring=CREATE_TABLE_QUERY,
             )
+            await self.create_auxiliary_tables()
         except Exception as exc:
             raise CommandError("Cannot initialize m3p0") from exc
 
         return SuccessCommandResult(
             message="m3p0 initialized",
         )
+
+    async def create_auxiliary_tables(self: Self) -> None:
+        """Create tables and indexes added after the first release.
+
+        They are created with `IF NOT EXISTS`,
+        so already initialized databases get them too.
+        """
+        await self.driver.execute(
+            querystring=CREATE_REVISION_INDEX_QUERY,
+        )
+        await self.driver.execute(
+            querystring=CREATE_STATEMENT_PROGRESS_TABLE_QUERY,
+        )
+        await self.driver.execute(
+            querystring=CREATE_PARTITION_PROGRESS_TABLE_QUERY,
+        )
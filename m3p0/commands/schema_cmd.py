@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+from typing import Self
+
+from m3p0.commands.base import BaseCommandResult, Command, FailCommandResult, SuccessCommandResult
+from m3p0.consts import SCHEMA_SNAPSHOT_FILE_NAME
+from m3p0.schema import diff_schema_snapshots, dump_schema_snapshot, retrieve_schema_snapshot
+from m3p0.utils import directory_migrations
+
+
+class SchemaSnapshotCommand(Command):
+    """Command stores database schema alongside the head migration."""
+
+    async def execute_cmd(self: Self) -> BaseCommandResult:
+        migrations = directory_migrations(config=self.config)
+        if not migrations:
+            return FailCommandResult(
+                "There are no migrations to store the snapshot with.",
+            )
+
+        snapshot = await retrieve_schema_snapshot(driver=self.driver)
+        snapshot_path = Path(migrations[-1].path) / SCHEMA_SNAPSHOT_FILE_NAME
+        snapshot_path.write_text(dump_schema_snapshot(snapshot))
+
+        return SuccessCommandResult(
+            f"Schema snapshot saved to {snapshot_path}",
+        )
+
+
+class SchemaDiffCommand(Command):
+    """Command compares database schema with the stored snapshot."""
+
+    async def execute_cmd(self: Self) -> BaseCommandResult:
+        migrations = directory_migrations(config=self.config)
+        if not migrations:
+            return FailCommandResult("There are no migrations.")
+
+        snapshot_path = Path(migrations[-1].path) / SCHEMA_SNAPSHOT_FILE_NAME
+        if not snapshot_path.exists():
+            return FailCommandResult(
+                f"There is no schema snapshot in {snapshot_path.parent}, "
+                "create it with `m3p0 schema snapshot`",
+            )
+
+        expected_snapshot = json.loads(snapshot_path.read_text())
+        # Round trip through JSON to compare values of the same types.
+        actual_snapshot = json.loads(
+            dump_schema_snapshot(
+                await retrieve_schema_snapshot(driver=self.driver),
+            ),
+        )
+
+        differences = diff_schema_snapshots(
+            expected=expected_snapshot,
+            actual=actual_snapshot,
+        )
+        if differences:
+            return FailCommandResult(
+                "Database schema drifted from the snapshot:\n"
+                + "\n".join(differences),
+            )
+
+        return SuccessCommandResult(
+            "Database schema matches the snapshot.",
+        )
@@ -0,0 +1,140 @@
+import time
+from typing import Self
+
+from colorama import Fore
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.base import BaseCommandResult, Command, FailCommandResult
+from m3p0.driver import M3P0Driver
+from m3p0.models import Migration
+from m3p0.utils import directory_migrations
+from m3p0.watcher import build_watcher
+
+
+class WatchCommand(Command):
+    """Command re-applies the head migration on every change."""
+
+    def __init__(
+        self: Self,
+        config: ApplicationConfig,
+        head_applied: bool,
+        poll_interval: float,
+        driver: M3P0Driver | None = None,
+    ) -> None:
+        """Initialize the watch command.
+
+        ### Parameters:
+        - `head_applied`: is head migration already applied or not.
+        - `poll_interval`: polling interval if inotify is unavailable.
+        """
+        super().__init__(config=config, driver=driver)
+        self.head_applied = head_applied
+        self.poll_interval = poll_interval
+        # SQL that is currently applied to the database.
+        self.applied_sql: str | None = None
+        self.applied_rollback_sql: str | None = None
+
+    async def execute_cmd(self: Self) -> BaseCommandResult:
+        migrations = directory_migrations(config=self.config)
+        if not migrations:
+            return FailCommandResult(
+                "There are no migrations to watch.",
+            )
+
+        head_migration = migrations[-1]
+        if self.head_applied:
+            self.applied_sql = head_migration.read_sql("apply.sql")
+            self.applied_rollback_sql = head_migration.read_sql(
+                "rollback.sql",
+            )
+
+        watcher = build_watcher(
+            path=head_migration.path,
+            poll_interval=self.poll_interval,
+        )
+        print(Fore.CYAN + f"Watching {head_migration.path}")
+        try:
+            while True:
+                await watcher.wait_for_change()
+                await self.handle_change(migration=head_migration)
+        finally:
+            watcher.close()
+
+    async def handle_change(self: Self, migration: Migration) -> None:
+        """Re-apply migration if its `apply.sql` changed.
+
+        If only `rollback.sql` changed, it replaces the rollback
+        of the applied SQL, so fixed rollback is used on the next change.
+
+        ### Parameters:
+        - `migration`: watched migration.
+        """
+        apply_sql = migration.read_sql("apply.sql")
+        if apply_sql != self.applied_sql:
+            await self.reapply_migration(
+                migration=migration,
+                apply_sql=apply_sql,
+            )
+            return
+
+        rollback_sql = migration.read_sql("rollback.sql")
+        if (
+            self.applied_rollback_sql is not None
+            and rollback_sql != self.applied_rollback_sql
+        ):
+            self.applied_rollback_sql = rollback_sql
+            print(Fore.CYAN + "Rollback updated, used on the next change")
+
+    async def reapply_migration(
+        self: Self,
+        migration: Migration,
+        apply_sql: str,
+    ) -> None:
+        """Rollback previously applied SQL and apply the new one.
+
+        If both apply and rollback can be executed in a transaction,
+        they are executed in the same one, so failed apply
+        leaves the database untouched.
+
+        ### Parameters:
+        - `migration`: migration to re-apply.
+        - `apply_sql`: new content of the `apply.sql`.
+        """
+        spec = migration.spec
+        rollback_sql = migration.read_sql("rollback.sql")
+        start_time = time.perf_counter()
+
+        try:
+            if self.applied_rollback_sql is None:
+                await self.driver.execute_migration(
+                    querystring=apply_sql,
+                    in_transaction=spec.apply_in_transaction,
+                )
+            elif spec.apply_in_transaction and spec.rollback_in_transaction:
+                await self.driver.execute_migration(
+                    querystring=f"{self.applied_rollback_sql}\n;\n{apply_sql}",
+                    in_transaction=True,
+                )
+            else:
+                await self.driver.execute_migration(
+                    querystring=self.applied_rollback_sql,
+                    in_transaction=spec.rollback_in_transaction,
+                )
+                self.applied_sql = None
+                self.applied_rollback_sql = None
+                await self.driver.execute_migration(
+                    querystring=apply_sql,
+                    in_transaction=spec.apply_in_transaction,
+                )
+        except Exception as exc:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(
+                Fore.RED
+                + f"Failed to re-apply migration in {elapsed_ms:.1f} ms: {exc}",
+            )
+            return
+
+        self.applied_sql = apply_sql
+        self.applied_rollback_sql = rollback_sql
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        print(Fore.GREEN + f"Migration re-applied in {elapsed_ms:.1f} ms")
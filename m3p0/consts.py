@@ -1,3 +1,10 @@
 from typing import Final
 
 MAX_MIGRATION_NAME_LENGTH: Final = 128
+SCHEMA_SNAPSHOT_FILE_NAME: Final = "schema_snapshot.json"
+PARTITION_PLACEHOLDER: Final = "{partition}"
+
+# Advisory lock for applying migrations is keyed by the migration table
+MIGRATIONS_LOCK_NAME: Final = "M3P0_migrations"
+LOCK_WAIT_INITIAL_DELAY: Final = 0.1
+LOCK_WAIT_MAX_DELAY: Final = 5.0
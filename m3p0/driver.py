@@ -1,9 +1,12 @@
+import contextlib
 import os
-from typing import Any, Protocol, Self, runtime_checkable
+from typing import Any, AsyncIterator, Protocol, Self, runtime_checkable
 
-from psqlpy import ConnectionPool
+from psqlpy import Connection, ConnectionPool
 
-from m3p0.app_config import application_config
+from m3p0.app_config import ApplicationConfig
+from m3p0.queries import ADVISORY_UNLOCK, TRY_ADVISORY_LOCK
+from m3p0.sql import split_statements
 
 
 @runtime_checkable
@@ -61,22 +64,129 @@ class M3P0Driver(Protocol):
         """
 
 
+@runtime_checkable
+class M3P0LockingDriver(M3P0Driver, Protocol):
+    """Driver that can hold PostgreSQL advisory lock.
+
+    Only one process applies migrations if driver supports it.
+    """
+
+    def try_advisory_lock(
+        self: Self,
+        lock_name: str,
+    ) -> contextlib.AbstractAsyncContextManager[bool]:
+        """Try to take session advisory lock without waiting.
+
+        Lock must be held on its own connection until
+        the context manager exits.
+
+        ### Parameters:
+        - `lock_name`: name of the lock, it's hashed to the lock key.
+
+        ### Returns:
+        context manager with flag is lock taken or not.
+        """
+
+
+@runtime_checkable
+class M3P0RecordingDriver(M3P0Driver, Protocol):
+    """Driver that can record migration in its own transaction.
+
+    Without it, migration is recorded after its transaction is committed,
+    so crash between them leads to applying migration twice.
+    """
+
+    async def execute_migration_and_record(
+        self: Self,
+        querystring: str,
+        record_querystring: str,
+        record_parameters: list[Any],
+    ) -> None:
+        """Execute migration and record query in one transaction.
+
+        ### Parameters:
+        - `querystring`: migration query to execute.
+        - `record_querystring`: query recording the migration.
+        - `record_parameters`: parameters for the record query.
+        """
+
+
+@runtime_checkable
+class M3P0SessionDriver(M3P0Driver, Protocol):
+    """Driver that can run many queries on one connection.
+
+    Session settings like `SET lock_timeout` are applied
+    only to the connection they are executed on,
+    so statements they protect must use the same one.
+    """
+
+    def session(
+        self: Self,
+    ) -> contextlib.AbstractAsyncContextManager[M3P0Driver]:
+        """Acquire one connection until the context manager exits.
+
+        Returned driver must not be used concurrently.
+
+        ### Returns:
+        context manager with driver running all queries
+        on the acquired connection.
+        """
+
+    def max_sessions(self: Self) -> int:
+        """Maximum number of sessions that can be open at once."""
+
+
+def driver_session(
+    driver: M3P0Driver,
+) -> contextlib.AbstractAsyncContextManager[M3P0Driver]:
+    """Open session if driver supports it.
+
+    ### Parameters:
+    - `driver`: driver to the database.
+
+    ### Returns:
+    context manager with session driver or the driver itself.
+    """
+    if isinstance(driver, M3P0SessionDriver):
+        return driver.session()
+    return contextlib.nullcontext(driver)
+
+
 class PSQLPyM3P0Driver:
     """M3P0 driver based on `PSQLPy`."""
 
-    def __init__(self: Self) -> None:
-        """Initialize new driver instance."""
+    def __init__(
+        self: Self,
+        config: ApplicationConfig | None = None,
+        conn_pool: ConnectionPool | None = None,
+    ) -> None:
+        """Initialize new driver instance.
+
+        ### Parameters:
+        - `config`: config to build new connection pool from.
+        - `conn_pool`: existing connection pool, config is ignored if passed.
+        """
+        # Connection of the session, see `session`.
+        self.connection: Connection | None = None
+        if conn_pool:
+            self.conn_pool = conn_pool
+            return
+
+        if not config:
+            config = ApplicationConfig()
 
-        if application_config.postgres_url:
+        if config.postgres_url:
             self.conn_pool = ConnectionPool(
-                dsn=application_config.postgres_url,
+                dsn=config.postgres_url,
+                max_db_pool_size=config.pool_size,
             )
             return
-        elif application_config.postgres_url_env:
-            postgres_url = os.getenv(application_config.postgres_url_env)
+        elif config.postgres_url_env:
+            postgres_url = os.getenv(config.postgres_url_env)
             if postgres_url:
                 self.conn_pool = ConnectionPool(
-                    dsn=application_config.postgres_url,
+                    dsn=postgres_url,
+                    max_db_pool_size=config.pool_size,
                 )
                 return
         
@@ -87,7 +197,7 @@ class PSQLPyM3P0Driver:
 
     async def exists(self: Self, querystring: str, parameters: list[Any] | None = None) -> bool:
         """Check is version exists or not."""
-        async with self.conn_pool.acquire() as conn:
+        async with self._acquire() as conn:
             return await conn.fetch_val(
                 querystring=querystring,
                 parameters=parameters,
@@ -100,7 +210,7 @@ class PSQLPyM3P0Driver:
         parameters: list[Any] | None = None,
     ) -> list[dict[str, Any]] | None:
         """Execute query and fetch data from response."""
-        async with self.conn_pool.acquire() as conn:
+        async with self._acquire() as conn:
             response = await conn.fetch(
                 querystring=querystring,
                 parameters=parameters,
@@ -121,7 +231,7 @@ class PSQLPyM3P0Driver:
         Querystring must return exactly one value,
         otherwise exception will be raised.
         """
-        async with self.conn_pool.acquire() as conn:
+        async with self._acquire() as conn:
             return await conn.fetch_val(
                 querystring=querystring,
                 parameters=parameters,
@@ -137,7 +247,7 @@ class PSQLPyM3P0Driver:
         
         Don't return anything, just run the query.
         """
-        async with self.conn_pool.acquire() as conn:
+        async with self._acquire() as conn:
             await conn.execute(
                 querystring=querystring,
                 parameters=parameters,
@@ -155,11 +265,92 @@ class PSQLPyM3P0Driver:
         - `querystring`: migration query to execute.
         - `in_transaction`: flag execute migration in transaction or not.
         """
-        async with self.conn_pool.acquire() as conn:
+        async with self._acquire() as conn:
             if in_transaction:
                 async with conn.transaction() as transaction:
                     await transaction.execute_batch(
                         querystring=querystring,
                     )
             else:
-                await conn.execute_many(querystring=querystring)
+                # Statements like `CREATE INDEX CONCURRENTLY` fail
+                # in the implicit transaction of a multi-statement query,
+                # so statements are sent one by one.
+                for statement in split_statements(querystring):
+                    await conn.execute(
+                        querystring=statement.text,
+                        prepared=False,
+                    )
+
+    async def execute_migration_and_record(
+        self: Self,
+        querystring: str,
+        record_querystring: str,
+        record_parameters: list[Any],
+    ) -> None:
+        """Execute migration and record query in one transaction.
+
+        ### Parameters:
+        - `querystring`: migration query to execute.
+        - `record_querystring`: query recording the migration.
+        - `record_parameters`: parameters for the record query.
+        """
+        async with self._acquire() as conn:
+            async with conn.transaction() as transaction:
+                await transaction.execute_batch(querystring=querystring)
+                await transaction.execute(
+                    querystring=record_querystring,
+                    parameters=record_parameters,
+                    prepared=False,
+                )
+
+    @contextlib.asynccontextmanager
+    async def session(self: Self) -> AsyncIterator["PSQLPyM3P0Driver"]:
+        """Acquire one connection until the context manager exits.
+
+        ### Returns:
+        driver running all queries on the acquired connection.
+        """
+        async with self.conn_pool.acquire() as conn:
+            session_driver = PSQLPyM3P0Driver(conn_pool=self.conn_pool)
+            session_driver.connection = conn
+            yield session_driver
+
+    def max_sessions(self: Self) -> int:
+        """Maximum number of sessions that can be open at once."""
+        return self.conn_pool.status().max_size
+
+    @contextlib.asynccontextmanager
+    async def _acquire(self: Self) -> AsyncIterator[Connection]:
+        """Use connection of the session or acquire one from the pool."""
+        if self.connection is not None:
+            yield self.connection
+            return
+
+        async with self.conn_pool.acquire() as conn:
+            yield conn
+
+    @contextlib.asynccontextmanager
+    async def try_advisory_lock(
+        self: Self,
+        lock_name: str,
+    ) -> AsyncIterator[bool]:
+        """Try to take session advisory lock without waiting.
+
+        ### Parameters:
+        - `lock_name`: name of the lock, it's hashed to the lock key.
+        """
+        async with self._acquire() as conn:
+            is_locked = await conn.fetch_val(
+                querystring=TRY_ADVISORY_LOCK,
+                parameters=[lock_name],
+                prepared=False,
+            )
+            try:
+                yield is_locked
+            finally:
+                if is_locked:
+                    await conn.execute(
+                        querystring=ADVISORY_UNLOCK,
+                        parameters=[lock_name],
+                        prepared=False,
+                    )
@@ -1,2 +1,5 @@
 class CommandError(Exception):
-    """"""
\ No newline at end of file
+    """"""
+
+class BundleError(Exception):
+    """Error during reading or building migration bundle."""
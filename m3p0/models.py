@@ -1,6 +1,7 @@
 
 
 from dataclasses import dataclass
+from pathlib import Path
 from uuid import UUID
 
 
@@ -11,3 +12,50 @@ class MigrationModel:
     version: str
     revision: UUID
     is_applied: bool | None
+
+
+@dataclass
+class PartitionedSpec:
+    """Per-partition part of the migration.
+
+    Template is executed for every leaf partition of the parent table
+    with `{partition}` replaced by the partition name,
+    finalize file is executed once after all partitions.
+    """
+    parent_table: str
+    template_file: str
+    finalize_file: str | None = None
+    concurrency: int = 4
+    in_transaction: bool = False
+
+
+@dataclass
+class MigrationSpec:
+    revision: str
+    back_revision: str | None
+    apply_in_transaction: bool
+    rollback_in_transaction: bool
+    partitioned: PartitionedSpec | None = None
+
+    def __post_init__(self) -> None:
+        if isinstance(self.partitioned, dict):
+            self.partitioned = PartitionedSpec(**self.partitioned)
+
+
+@dataclass
+class Migration:
+    """Local migration with its specification and directory."""
+    spec: MigrationSpec
+    path: str
+
+    def read_sql(self, file_name: str) -> str:
+        """Read SQL file from the migration directory.
+
+        ### Parameters:
+        - `file_name`: name of the file, `apply.sql` for example.
+
+        ### Returns:
+        content of the file.
+        """
+        with Path(f"{self.path}/{file_name}").open() as sql_file:
+            return sql_file.read()
@@ -0,0 +1,256 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Self
+
+from m3p0.driver import M3P0Driver, driver_session
+from m3p0.queries import CANCEL_BACKEND, RETRIEVE_BLOCKED_BY_MIGRATION
+
+
+def migration_tag(revision: str) -> str:
+    """Build comment to find migration backend in `pg_stat_activity`.
+
+    ### Parameters:
+    - `revision`: revision of the migration.
+
+    ### Returns:
+    SQL comment, must be placed at the start of the query.
+    """
+    return f"/* m3p0:{revision} */"
+
+
+@dataclass
+class BlockedSession:
+    """Session blocked by the migration."""
+    pid: int
+    query: str
+    # Milliseconds since the session started waiting for the lock
+    blocked_ms: int
+
+    def describe(self: Self) -> str:
+        """One line description for the report."""
+        query = " ".join(self.query.split())
+        return f"[{self.pid}, {self.blocked_ms} ms] {query}"
+
+
+@dataclass
+class LockSample:
+    """One sample of sessions blocked by one migration backend."""
+    # Milliseconds since the monitor start
+    elapsed_ms: int
+    migration_pid: int
+    blocked_sessions: list[BlockedSession]
+
+
+@dataclass
+class LockMonitorReport:
+    """Data collected by the lock monitor."""
+    samples_number: int = 0
+    max_blocked_sessions: int = 0
+    max_blocked_ms: int = 0
+    # Only samples with blocked sessions are stored
+    blocking_samples: list[LockSample] = field(default_factory=list)
+    cancel_reason: str | None = None
+
+    def summary(self: Self) -> str:
+        """Human-readable summary for the apply report."""
+        summary = (
+            f"lock monitor: {self.samples_number} samples, "
+            f"max {self.max_blocked_sessions} blocked sessions, "
+            f"longest block {self.max_blocked_ms} ms"
+        )
+        if self.cancel_reason:
+            summary += f"\nmigration cancelled: {self.cancel_reason}"
+        for sample in self.blocking_samples:
+            summary += (
+                f"\n  +{sample.elapsed_ms} ms: backend {sample.migration_pid} "
+                f"blocks {len(sample.blocked_sessions)} sessions"
+            )
+            summary += "".join(
+                f"\n    {session.describe()}"
+                for session in sample.blocked_sessions
+            )
+        return summary
+
+
+class LockMonitor:
+    """Monitor of sessions blocked by the running migration.
+
+    It samples `pg_stat_activity` on its own connection, taken
+    before the migration starts, and cancels every migration backend
+    that blocks too many sessions or blocks them for too long.
+    Migration can have several backends, one per partition for example.
+
+    Must be used as an async context manager around migration execution.
+    """
+
+    def __init__(
+        self: Self,
+        driver: M3P0Driver,
+        tag: str,
+        interval_ms: int,
+        max_blocked_sessions: int | None,
+        max_blocked_ms: int | None,
+    ) -> None:
+        """Initialize new lock monitor.
+
+        ### Parameters:
+        - `driver`: driver to the database, if it supports sessions
+            monitor holds its own connection, otherwise samples
+            can wait for a free connection of the pool.
+        - `tag`: tag of the migration, see `migration_tag`.
+        - `interval_ms`: interval between samples.
+        - `max_blocked_sessions`: cancel migration if it blocks more sessions.
+        - `max_blocked_ms`: cancel migration if it blocks any session longer.
+        """
+        self.driver = driver
+        self.tag = tag
+        self.interval_ms = interval_ms
+        self.max_blocked_sessions = max_blocked_sessions
+        self.max_blocked_ms = max_blocked_ms
+        self.report = LockMonitorReport()
+        self._cancelled_pids: set[int] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._exit_stack = contextlib.AsyncExitStack()
+
+    async def __aenter__(self: Self) -> Self:
+        # Connection is taken before the migration starts,
+        # so sampling never waits for the migration to finish.
+        session = await self._exit_stack.enter_async_context(
+            driver_session(self.driver),
+        )
+        self._task = asyncio.create_task(self._monitor(session=session))
+        return self
+
+    async def __aexit__(
+        self: Self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        await self._exit_stack.aclose()
+
+    async def _monitor(self: Self, session: M3P0Driver) -> None:
+        """Take samples until cancellation."""
+        start_time = time.perf_counter()
+        while True:
+            await asyncio.sleep(self.interval_ms / 1000)
+            try:
+                samples = await self._take_samples(
+                    session=session,
+                    elapsed_ms=int((time.perf_counter() - start_time) * 1000),
+                )
+            except Exception:
+                # Monitoring must never break the migration itself.
+                continue
+
+            if not samples:
+                continue
+
+            self.report.samples_number += 1
+            for sample in samples:
+                cancel_reason = self._register_sample(sample)
+                if (
+                    cancel_reason
+                    and sample.migration_pid not in self._cancelled_pids
+                ):
+                    await self._cancel_backend(
+                        session=session,
+                        pid=sample.migration_pid,
+                        cancel_reason=cancel_reason,
+                    )
+
+    async def _cancel_backend(
+        self: Self,
+        session: M3P0Driver,
+        pid: int,
+        cancel_reason: str,
+    ) -> None:
+        """Cancel migration backend and add reason to the report."""
+        self._cancelled_pids.add(pid)
+        backend_reason = f"backend {pid}: {cancel_reason}"
+        self.report.cancel_reason = (
+            f"{self.report.cancel_reason}\n{backend_reason}"
+            if self.report.cancel_reason
+            else backend_reason
+        )
+        await session.fetch_val(
+            querystring=CANCEL_BACKEND,
+            parameters=[pid],
+        )
+
+    async def _take_samples(
+        self: Self,
+        session: M3P0Driver,
+        elapsed_ms: int,
+    ) -> list[LockSample]:
+        """Retrieve sessions blocked by every migration backend."""
+        records = await session.fetch(
+            querystring=RETRIEVE_BLOCKED_BY_MIGRATION,
+            parameters=[f"{self.tag}%"],
+        )
+
+        samples: dict[int, LockSample] = {}
+        for record in records or []:
+            sample = samples.setdefault(
+                record["migration_pid"],
+                LockSample(
+                    elapsed_ms=elapsed_ms,
+                    migration_pid=record["migration_pid"],
+                    blocked_sessions=[],
+                ),
+            )
+            if record["blocked_pid"] is not None:
+                sample.blocked_sessions.append(
+                    BlockedSession(
+                        pid=record["blocked_pid"],
+                        query=record["blocked_query"],
+                        blocked_ms=record["blocked_ms"] or 0,
+                    ),
+                )
+        return list(samples.values())
+
+    def _register_sample(self: Self, sample: LockSample) -> str | None:
+        """Add sample to the report and check thresholds.
+
+        ### Returns:
+        reason to cancel the migration backend or None.
+        """
+        report = self.report
+        if not sample.blocked_sessions:
+            return None
+
+        report.blocking_samples.append(sample)
+        blocked_number = len(sample.blocked_sessions)
+        longest_block = max(
+            session.blocked_ms for session in sample.blocked_sessions
+        )
+        report.max_blocked_sessions = max(
+            report.max_blocked_sessions,
+            blocked_number,
+        )
+        report.max_blocked_ms = max(report.max_blocked_ms, longest_block)
+
+        if (
+            self.max_blocked_sessions is not None
+            and blocked_number > self.max_blocked_sessions
+        ):
+            reason = f"{blocked_number} sessions blocked"
+        elif (
+            self.max_blocked_ms is not None
+            and longest_block > self.max_blocked_ms
+        ):
+            reason = f"session blocked for {longest_block} ms"
+        else:
+            return None
+
+        blocked_queries = "\n".join(
+            f"  {session.describe()}" for session in sample.blocked_sessions
+        )
+        return f"{reason}, blocked queries:\n{blocked_queries}"
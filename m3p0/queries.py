@@ -2,7 +2,7 @@ IS_TABLE_EXISTS_QUERY = """
 SELECT EXISTS (
     SELECT FROM information_schema.tables 
     WHERE  table_schema = 'public'
-    AND    table_name   = 'M3P0_migrations'
+    AND    table_name   = 'm3p0_migrations'
 )
 """
 
@@ -18,7 +18,7 @@ CREATE TABLE M3P0_migrations (
 IS_VERSION_ALREADY_EXIST = """
 SELECT EXISTS (
     SELECT version 
-    FROM m3p0
+    FROM M3P0_migrations
     WHERE version = $1
 )
 """
@@ -31,7 +31,254 @@ LIMIT 1
 """
 
 RETRIEVE_SORTED_REVISIONS = """
-SELECT revision
+SELECT id, version, revision, is_applied
 FROM M3P0_migrations
-ORDER BY id DESC
+ORDER BY id
+"""
+
+INSERT_APPLIED_MIGRATION = """
+INSERT INTO M3P0_migrations (version, revision, is_applied)
+VALUES ($1, $2, TRUE)
+"""
+
+CREATE_REVISION_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS m3p0_migrations_revision_idx
+ON M3P0_migrations (revision)
+"""
+
+IS_REVISION_APPLIED = """
+SELECT EXISTS (
+    SELECT FROM M3P0_migrations
+    WHERE revision = $1
+    AND is_applied IS NOT FALSE
+)
+"""
+
+TRY_ADVISORY_LOCK = """
+SELECT pg_try_advisory_lock(hashtext($1))
+"""
+
+ADVISORY_UNLOCK = """
+SELECT pg_advisory_unlock(hashtext($1))
+"""
+
+CREATE_STATEMENT_PROGRESS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS M3P0_statement_progress (
+    revision UUID,
+    statement_offset INTEGER,
+    statement_hash VARCHAR,
+    completed_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (revision, statement_offset, statement_hash)
+)
+"""
+
+RETRIEVE_COMPLETED_STATEMENTS = """
+SELECT statement_offset, statement_hash
+FROM M3P0_statement_progress
+WHERE revision = $1
+"""
+
+INSERT_COMPLETED_STATEMENT = """
+INSERT INTO M3P0_statement_progress (
+    revision,
+    statement_offset,
+    statement_hash
+)
+VALUES ($1, $2, $3)
+ON CONFLICT DO NOTHING
+"""
+
+RESET_SESSION_SETTINGS = """
+RESET ALL
+"""
+
+DELETE_COMPLETED_STATEMENTS = """
+DELETE FROM M3P0_statement_progress
+WHERE revision = $1
+"""
+
+CREATE_PARTITION_PROGRESS_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS M3P0_partition_progress (
+    revision UUID,
+    partition_name VARCHAR,
+    template_hash VARCHAR,
+    completed_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (revision, partition_name, template_hash)
+)
+"""
+
+RETRIEVE_LEAF_PARTITIONS = """
+SELECT format('%I.%I', n.nspname, c.relname) AS partition_name
+FROM pg_partition_tree($1::text::regclass) tree
+JOIN pg_catalog.pg_class c ON c.oid = tree.relid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE tree.isleaf
+ORDER BY 1
+"""
+
+RETRIEVE_COMPLETED_PARTITIONS = """
+SELECT partition_name
+FROM M3P0_partition_progress
+WHERE revision = $1
+AND template_hash = $2
+"""
+
+INSERT_COMPLETED_PARTITION = """
+INSERT INTO M3P0_partition_progress (
+    revision,
+    partition_name,
+    template_hash
+)
+VALUES ($1, $2, $3)
+ON CONFLICT DO NOTHING
+"""
+
+DELETE_COMPLETED_PARTITIONS = """
+DELETE FROM M3P0_partition_progress
+WHERE revision = $1
+"""
+
+# Schema snapshot queries.
+# Every query returns all objects of one kind at once,
+# system schemas, extension objects and m3p0 tables are excluded.
+# Columns of `name` type are cast to text, PSQLPy cannot decode them.
+SNAPSHOT_COLUMNS_QUERY = r"""
+SELECT
+    n.nspname::text AS schema_name,
+    c.relname::text AS table_name,
+    c.relkind::text AS kind,
+    a.attname::text AS column_name,
+    format_type(a.atttypid, a.atttypmod) AS column_type,
+    a.attnotnull AS not_null,
+    pg_get_expr(d.adbin, d.adrelid) AS default_value
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_catalog.pg_attribute a
+    ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+LEFT JOIN pg_catalog.pg_attrdef d
+    ON d.adrelid = c.oid AND d.adnum = a.attnum
+WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+AND n.nspname NOT LIKE 'pg\_toast%'
+AND n.nspname NOT LIKE 'pg\_temp%'
+AND c.relname NOT LIKE 'm3p0\_%'
+AND NOT EXISTS (
+    SELECT FROM pg_catalog.pg_depend dep
+    WHERE dep.objid = c.oid AND dep.deptype = 'e'
+)
+"""
+
+SNAPSHOT_INDEXES_QUERY = r"""
+SELECT
+    n.nspname::text AS schema_name,
+    i.relname::text AS index_name,
+    t.relname::text AS table_name,
+    pg_get_indexdef(i.oid) AS definition
+FROM pg_catalog.pg_index x
+JOIN pg_catalog.pg_class i ON i.oid = x.indexrelid
+JOIN pg_catalog.pg_class t ON t.oid = x.indrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = i.relnamespace
+WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+AND n.nspname NOT LIKE 'pg\_toast%'
+AND n.nspname NOT LIKE 'pg\_temp%'
+AND t.relname NOT LIKE 'm3p0\_%'
+AND NOT EXISTS (
+    SELECT FROM pg_catalog.pg_depend dep
+    WHERE dep.objid = t.oid AND dep.deptype = 'e'
+)
+"""
+
+SNAPSHOT_CONSTRAINTS_QUERY = r"""
+SELECT
+    n.nspname::text AS schema_name,
+    t.relname::text AS table_name,
+    con.conname::text AS constraint_name,
+    con.contype::text AS constraint_type,
+    pg_get_constraintdef(con.oid) AS definition
+FROM pg_catalog.pg_constraint con
+JOIN pg_catalog.pg_class t ON t.oid = con.conrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = t.relnamespace
+WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+AND n.nspname NOT LIKE 'pg\_toast%'
+AND n.nspname NOT LIKE 'pg\_temp%'
+AND t.relname NOT LIKE 'm3p0\_%'
+AND NOT EXISTS (
+    SELECT FROM pg_catalog.pg_depend dep
+    WHERE dep.objid = t.oid AND dep.deptype = 'e'
+)
+"""
+
+SNAPSHOT_FUNCTIONS_QUERY = r"""
+SELECT
+    n.nspname::text AS schema_name,
+    p.proname::text AS function_name,
+    pg_get_function_identity_arguments(p.oid) AS arguments,
+    pg_get_function_result(p.oid) AS result,
+    l.lanname::text AS language,
+    md5(p.prosrc) AS body_md5
+FROM pg_catalog.pg_proc p
+JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
+JOIN pg_catalog.pg_language l ON l.oid = p.prolang
+WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+AND n.nspname NOT LIKE 'pg\_toast%'
+AND n.nspname NOT LIKE 'pg\_temp%'
+AND NOT EXISTS (
+    SELECT FROM pg_catalog.pg_depend dep
+    WHERE dep.objid = p.oid AND dep.deptype = 'e'
+)
+"""
+
+SNAPSHOT_SEQUENCES_QUERY = r"""
+SELECT
+    n.nspname::text AS schema_name,
+    c.relname::text AS sequence_name,
+    format_type(s.seqtypid, NULL) AS data_type,
+    s.seqstart AS start_value,
+    s.seqincrement AS increment,
+    s.seqmin AS min_value,
+    s.seqmax AS max_value,
+    s.seqcycle AS is_cycled
+FROM pg_catalog.pg_sequence s
+JOIN pg_catalog.pg_class c ON c.oid = s.seqrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+AND n.nspname NOT LIKE 'pg\_temp%'
+AND c.relname NOT LIKE 'm3p0\_%'
+AND NOT EXISTS (
+    SELECT FROM pg_catalog.pg_depend dep
+    WHERE dep.objid = c.oid AND dep.deptype = 'e'
+)
+"""
+
+# Sessions blocked by the migration backend.
+# Migration backend is found by the tag at the start of its query,
+# the row with NULL blocked_pid means nothing is blocked.
+# Blocking time is counted from the start of the lock wait,
+# not from the start of the blocked query, `waitstart` needs PostgreSQL 14.
+RETRIEVE_BLOCKED_BY_MIGRATION = """
+SELECT
+    migration.pid AS migration_pid,
+    blocked.pid AS blocked_pid,
+    blocked.query AS blocked_query,
+    COALESCE(
+        EXTRACT(EPOCH FROM clock_timestamp() - waiting.waitstart) * 1000,
+        0
+    )::BIGINT AS blocked_ms
+FROM pg_stat_activity migration
+LEFT JOIN pg_stat_activity blocked
+    ON migration.pid = ANY(pg_blocking_pids(blocked.pid))
+LEFT JOIN LATERAL (
+    SELECT min(waiting_lock.waitstart) AS waitstart
+    FROM pg_catalog.pg_locks waiting_lock
+    WHERE waiting_lock.pid = blocked.pid
+    AND NOT waiting_lock.granted
+) waiting ON TRUE
+WHERE migration.query LIKE $1
+AND migration.state <> 'idle'
+AND migration.pid <> pg_backend_pid()
+ORDER BY migration.pid, blocked.pid NULLS LAST
+"""
+
+CANCEL_BACKEND = """
+SELECT pg_cancel_backend($1)
 """
@@ -0,0 +1,168 @@
+import asyncio
+import json
+from typing import Any
+
+from m3p0.driver import M3P0Driver
+from m3p0.queries import (
+    SNAPSHOT_COLUMNS_QUERY,
+    SNAPSHOT_CONSTRAINTS_QUERY,
+    SNAPSHOT_FUNCTIONS_QUERY,
+    SNAPSHOT_INDEXES_QUERY,
+    SNAPSHOT_SEQUENCES_QUERY,
+)
+
+
+SchemaSnapshot = dict[str, dict[str, Any]]
+
+
+async def retrieve_schema_snapshot(driver: M3P0Driver) -> SchemaSnapshot:
+    """Introspect database schema.
+
+    Every kind of objects is retrieved with one catalog query,
+    all queries are executed concurrently.
+
+    ### Parameters:
+    - `driver`: driver to the database.
+
+    ### Returns:
+    schema snapshot with tables, indexes, constraints,
+    functions and sequences.
+    """
+    columns, indexes, constraints, functions, sequences = await asyncio.gather(
+        driver.fetch(querystring=SNAPSHOT_COLUMNS_QUERY),
+        driver.fetch(querystring=SNAPSHOT_INDEXES_QUERY),
+        driver.fetch(querystring=SNAPSHOT_CONSTRAINTS_QUERY),
+        driver.fetch(querystring=SNAPSHOT_FUNCTIONS_QUERY),
+        driver.fetch(querystring=SNAPSHOT_SEQUENCES_QUERY),
+    )
+
+    tables: dict[str, Any] = {}
+    for record in columns or []:
+        table = tables.setdefault(
+            f"{record['schema_name']}.{record['table_name']}",
+            {"kind": record["kind"], "columns": {}},
+        )
+        # Tables without columns still have one row.
+        if record["column_name"] is not None:
+            table["columns"][record["column_name"]] = {
+                "type": record["column_type"],
+                "not_null": record["not_null"],
+                "default": record["default_value"],
+            }
+
+    return {
+        "tables": tables,
+        "indexes": {
+            f"{record['schema_name']}.{record['index_name']}": {
+                "table": record["table_name"],
+                "definition": record["definition"],
+            }
+            for record in indexes or []
+        },
+        "constraints": {
+            (
+                f"{record['schema_name']}.{record['table_name']}"
+                f".{record['constraint_name']}"
+            ): {
+                "type": record["constraint_type"],
+                "definition": record["definition"],
+            }
+            for record in constraints or []
+        },
+        "functions": {
+            (
+                f"{record['schema_name']}.{record['function_name']}"
+                f"({record['arguments']})"
+            ): {
+                "result": record["result"],
+                "language": record["language"],
+                "body_md5": record["body_md5"],
+            }
+            for record in functions or []
+        },
+        "sequences": {
+            f"{record['schema_name']}.{record['sequence_name']}": {
+                "data_type": record["data_type"],
+                "start_value": record["start_value"],
+                "increment": record["increment"],
+                "min_value": record["min_value"],
+                "max_value": record["max_value"],
+                "is_cycled": record["is_cycled"],
+            }
+            for record in sequences or []
+        },
+    }
+
+
+def dump_schema_snapshot(snapshot: SchemaSnapshot) -> str:
+    """Serialize snapshot in canonical diff-friendly form.
+
+    ### Parameters:
+    - `snapshot`: schema snapshot.
+
+    ### Returns:
+    JSON with sorted keys, one attribute per line.
+    """
+    return json.dumps(snapshot, indent=2, sort_keys=True) + "\n"
+
+
+def diff_schema_snapshots(
+    expected: SchemaSnapshot,
+    actual: SchemaSnapshot,
+) -> list[str]:
+    """Compare two snapshots.
+
+    ### Parameters:
+    - `expected`: snapshot stored alongside the head migration.
+    - `actual`: snapshot of the live database.
+
+    ### Returns:
+    list of human-readable differences, empty if there is no drift.
+    """
+    differences: list[str] = []
+
+    for object_kind in sorted(expected.keys() | actual.keys()):
+        expected_objects = expected.get(object_kind, {})
+        actual_objects = actual.get(object_kind, {})
+
+        for object_name in sorted(expected_objects.keys() | actual_objects.keys()):
+            if object_name not in actual_objects:
+                differences.append(
+                    f"- {object_kind} {object_name} is missing in the database",
+                )
+            elif object_name not in expected_objects:
+                differences.append(
+                    f"+ {object_kind} {object_name} is not in the snapshot",
+                )
+            else:
+                differences.extend(
+                    f"~ {object_kind} {object_name}{path}: "
+                    f"expected {expected_value!r}, actual {actual_value!r}"
+                    for path, expected_value, actual_value in _diff_values(
+                        expected_objects[object_name],
+                        actual_objects[object_name],
+                    )
+                )
+
+    return differences
+
+
+def _diff_values(
+    expected: Any,
+    actual: Any,
+    path: str = "",
+) -> list[tuple[str, Any, Any]]:
+    """Find different leaf values in nested dicts."""
+    if not isinstance(expected, dict) or not isinstance(actual, dict):
+        return [] if expected == actual else [(path, expected, actual)]
+
+    differences = []
+    for key in sorted(expected.keys() | actual.keys()):
+        differences.extend(
+            _diff_values(
+                expected.get(key),
+                actual.get(key),
+                path=f"{path}.{key}",
+            ),
+        )
+    return differences
@@ -0,0 +1,199 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Final
+
+
+DOLLAR_QUOTE_REGEX: Final = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)?\$")
+# `SET` or `RESET` after optional leading comments.
+SESSION_SETTING_REGEX: Final = re.compile(
+    r"(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*(?:SET|RESET)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@dataclass
+class Statement:
+    """One SQL statement from the migration file."""
+    # Position of the statement in the migration file
+    offset: int
+    text: str
+
+    @property
+    def checksum(self) -> str:
+        """SHA256 of the statement text."""
+        return hashlib.sha256(self.text.encode()).hexdigest()
+
+    @property
+    def is_session_setting(self) -> bool:
+        """Statement changes settings of the session, `SET` or `RESET`."""
+        return SESSION_SETTING_REGEX.match(self.text) is not None
+
+
+def split_statements(querystring: str) -> list[Statement]:
+    """Split migration file into separate statements.
+
+    Semicolons inside string literals, quoted identifiers, comments,
+    parentheses, dollar-quoted and `BEGIN ATOMIC` bodies
+    don't split statements.
+    Statements with only comments are dropped.
+
+    ### Parameters:
+    - `querystring`: content of the migration file.
+
+    ### Returns:
+    list of statements in the order of appearance.
+    """
+    statements: list[Statement] = []
+    statement_start = 0
+    has_code = False
+    # Same approach as psql uses: BEGIN and CASE that are not
+    # the first word of the statement open a block closed by END,
+    # semicolons inside `BEGIN ATOMIC ... END` bodies don't split.
+    words_number = 0
+    block_depth = 0
+    # Rules like `DO ALSO (INSERT ...; INSERT ...)` have semicolons
+    # inside parentheses, psql doesn't split them too.
+    paren_depth = 0
+    position = 0
+    length = len(querystring)
+
+    while position < length:
+        char = querystring[position]
+        next_char = querystring[position + 1] if position + 1 < length else ""
+
+        if char == "-" and next_char == "-":
+            line_end = querystring.find("\n", position)
+            position = length if line_end == -1 else line_end + 1
+            continue
+
+        if char == "/" and next_char == "*":
+            position = _skip_block_comment(querystring, position)
+            continue
+
+        if char == "(":
+            paren_depth += 1
+        elif char == ")" and paren_depth > 0:
+            paren_depth -= 1
+
+        if char == ";" and block_depth == 0 and paren_depth == 0:
+            if has_code:
+                statements.append(
+                    _build_statement(querystring, statement_start, position),
+                )
+            position += 1
+            statement_start = position
+            has_code = False
+            words_number = 0
+            continue
+
+        if not char.isspace():
+            has_code = True
+
+        if char.isalpha() or char == "_":
+            word_end = position + 1
+            while word_end < length and (
+                querystring[word_end].isalnum()
+                or querystring[word_end] in ("_", "$")
+            ):
+                word_end += 1
+            word = querystring[position:word_end].lower()
+            words_number += 1
+
+            if word in ("begin", "case") and words_number > 1:
+                block_depth += 1
+            elif word == "end" and block_depth > 0:
+                block_depth -= 1
+
+            if word == "e" and querystring.startswith("'", word_end):
+                position = _skip_quoted(
+                    querystring,
+                    word_end,
+                    quote="'",
+                    backslash_escapes=True,
+                )
+            else:
+                position = word_end
+            continue
+
+        if char in ("'", '"'):
+            position = _skip_quoted(
+                querystring,
+                position,
+                quote=char,
+                backslash_escapes=False,
+            )
+            continue
+
+        if char == "$":
+            dollar_quote = DOLLAR_QUOTE_REGEX.match(querystring, position)
+            if dollar_quote:
+                body_end = querystring.find(
+                    dollar_quote.group(0),
+                    dollar_quote.end(),
+                )
+                position = (
+                    length
+                    if body_end == -1
+                    else body_end + len(dollar_quote.group(0))
+                )
+                continue
+
+        position += 1
+
+    if has_code:
+        statements.append(
+            _build_statement(querystring, statement_start, length),
+        )
+
+    return statements
+
+
+def _build_statement(querystring: str, start: int, end: int) -> Statement:
+    """Build statement without surrounding whitespaces."""
+    raw_statement = querystring[start:end]
+    text = raw_statement.strip()
+    offset = start + (len(raw_statement) - len(raw_statement.lstrip()))
+    return Statement(offset=offset, text=text)
+
+
+def _skip_block_comment(querystring: str, position: int) -> int:
+    """Return position after the block comment, they can be nested."""
+    depth = 0
+    length = len(querystring)
+    while position < length:
+        if querystring.startswith("/*", position):
+            depth += 1
+            position += 2
+        elif querystring.startswith("*/", position):
+            depth -= 1
+            position += 2
+            if depth == 0:
+                return position
+        else:
+            position += 1
+    return length
+
+
+def _skip_quoted(
+    querystring: str,
+    position: int,
+    quote: str,
+    backslash_escapes: bool,
+) -> int:
+    """Return position after the quoted literal or identifier."""
+    position += 1
+    length = len(querystring)
+    while position < length:
+        char = querystring[position]
+        if backslash_escapes and char == "\\":
+            position += 2
+            continue
+        if char == quote:
+            # Doubled quote is an escaped quote.
+            if querystring.startswith(quote, position + 1):
+                position += 2
+                continue
+            return position + 1
+        position += 1
+    return length
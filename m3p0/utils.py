@@ -1,6 +1,5 @@
-import asyncio
+import functools
 from contextlib import contextmanager
-from dataclasses import dataclass
 from importlib import import_module
 import inspect
 import json
@@ -10,20 +9,13 @@ import sys
 import types
 from typing import Any, Generator
 
+from m3p0.bundle import MigrationBundle
 from m3p0.driver import M3P0Driver, PSQLPyM3P0Driver
-from m3p0.app_config import application_config
-from m3p0.models import MigrationModel
+from m3p0.app_config import ApplicationConfig
+from m3p0.models import Migration, MigrationModel, MigrationSpec
 from m3p0.queries import RETRIEVE_SORTED_REVISIONS
 
 
-@dataclass
-class MigrationSpec:
-    revision: str
-    back_revision: str | None
-    apply_in_transaction: bool
-    rollback_in_transaction: bool
-
-
 @contextmanager
 def add_cwd_in_path() -> Generator[None, None, None]:
     """
@@ -70,22 +62,25 @@ def import_object(object_spec: str) -> Any:
     return getattr(module, import_spec[1])
 
 
-def retrieve_driver() -> M3P0Driver:
+async def retrieve_driver(config: ApplicationConfig) -> M3P0Driver:
     """Retrieve driver.
 
     If config file has driver path, try to import it and initialize.
     It could be func, async func or subclass of `M3P0Driver`.
 
+    ### Parameters:
+    - `config`: application config.
+
     ### Returns:
     subclass of `M3P0Driver`.
     """
-    if not application_config.driver:
-        return PSQLPyM3P0Driver()
+    if not config.driver:
+        return PSQLPyM3P0Driver(config=config)
 
-    driver_or_builder = import_object(application_config.driver)
+    driver_or_builder = import_object(config.driver)
 
     if inspect.iscoroutinefunction(driver_or_builder):
-        return _retrieve_driver(asyncio.run(driver_or_builder()))
+        return _retrieve_driver(await driver_or_builder())
     elif isinstance(driver_or_builder, types.FunctionType):
         return _retrieve_driver(driver_or_builder())
     else:
@@ -100,40 +95,93 @@ def _retrieve_driver(possible_driver: Any) -> M3P0Driver:
     raise ValueError("NOT")
 
 
-def migrations_revision_history() -> list[str]:
-    """Retrieve migration history by revisions locally.
-    
+def sorted_migrations(config: ApplicationConfig) -> list[Migration]:
+    """Retrieve local migrations sorted from the first to the head one.
+
+    If config has path to the existing bundle, migrations
+    are read only from it, otherwise from the migration directory.
+    Bundle isn't compared with the directory here,
+    `verify-bundle` command checks that it's up to date.
+
+    ### Parameters:
+    - `config`: application config.
+
     ### Returns:
-    list of sorted revisions.
+    list of sorted migrations.
+    """
+    bundle_path = config.bundle_path
+    if bundle_path and os.path.exists(bundle_path):
+        return load_bundle(bundle_path).migrations
+
+    return directory_migrations(config=config)
+
+
+@functools.cache
+def load_bundle(bundle_path: str) -> MigrationBundle:
+    """Open migration bundle once per process."""
+    return MigrationBundle(path=bundle_path)
+
+
+def directory_migrations(config: ApplicationConfig) -> list[Migration]:
+    """Retrieve migrations from the migration directory.
+
+    Migrations are sorted from the first to the head one.
+
+    ### Parameters:
+    - `config`: application config.
+
+    ### Returns:
+    list of sorted migrations.
     """
-    migrations_data: dict[str | None, MigrationSpec] = {}
+    migrations_data: dict[str | None, Migration] = {}
 
     all_migrations = [
         migration[0] for migration 
-        in os.walk(application_config.migration_path)
+        in os.walk(config.migration_path)
     ][1:]
 
-    # Need to store revision as a key and path as a path to the directory.
-    revision_to_path = {}
-    
     while all_migrations:
         migration = all_migrations.pop()
         with open(f"{migration}/specification.json") as migration_spec_json:
             migration_spec = MigrationSpec(**json.load(migration_spec_json))
 
-            migrations_data[migration_spec.back_revision] = migration_spec
+            migrations_data[migration_spec.back_revision] = Migration(
+                spec=migration_spec,
+                path=migration,
+            )
 
     # sort
-    sorted_migrations_revisions: list[str] = []
+    sorted_migrations: list[Migration] = []
 
     revision_back_revision = None
-    while len(sorted_migrations_revisions) != len(migrations_data):
-        migration_spec = migrations_data[revision_back_revision]
-        sorted_migrations_revisions.append(migration_spec.revision)
+    while len(sorted_migrations) != len(migrations_data):
+        migration_data = migrations_data[revision_back_revision]
+        sorted_migrations.append(migration_data)
+
+        revision_back_revision = migration_data.spec.revision
 
-        revision_back_revision = migration_spec.revision
+    return sorted_migrations
 
-    return sorted_migrations_revisions
+
+def migrations_revision_history(
+    config: ApplicationConfig,
+    from_directory: bool = False,
+) -> list[str]:
+    """Retrieve migration history by revisions locally.
+
+    ### Parameters:
+    - `config`: application config.
+    - `from_directory`: ignore bundle and read migration directory.
+    
+    ### Returns:
+    list of sorted revisions.
+    """
+    migrations = (
+        directory_migrations(config=config)
+        if from_directory
+        else sorted_migrations(config=config)
+    )
+    return [migration.spec.revision for migration in migrations]
 
 
 async def database_migration_history(
@@ -157,5 +205,5 @@ async def database_revision_history(
 
     return [
         migration.revision.hex for migration in migrations
-        if migration.is_applied is None or not migration.is_applied
+        if migration.is_applied is None or migration.is_applied
     ]
\ No newline at end of file
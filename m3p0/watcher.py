@@ -0,0 +1,147 @@
+import abc
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import sys
+from typing import Final, Self
+
+
+IN_MODIFY: Final = 0x00000002
+IN_CLOSE_WRITE: Final = 0x00000008
+IN_MOVED_TO: Final = 0x00000080
+IN_CREATE: Final = 0x00000100
+WATCH_MASK: Final = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# Editors usually produce several events for one save,
+# so wait a little and coalesce them into a single change.
+DEBOUNCE_SECONDS: Final = 0.05
+
+
+class FileWatcher(abc.ABC):
+    """Watcher for changes in one directory."""
+
+    @abc.abstractmethod
+    async def wait_for_change(self: Self) -> None:
+        """Wait until something in the directory changes."""
+
+    @abc.abstractmethod
+    def close(self: Self) -> None:
+        """Release all resources of the watcher."""
+
+
+class InotifyFileWatcher(FileWatcher):
+    """Watcher based on Linux `inotify` subsystem."""
+
+    def __init__(self: Self, path: str) -> None:
+        """Initialize new inotify watcher.
+
+        ### Parameters:
+        - `path`: directory to watch.
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("Cannot find libc to use inotify")
+
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.inotify_fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "Cannot initialize inotify")
+
+        watch_descriptor = libc.inotify_add_watch(
+            self.inotify_fd,
+            os.fsencode(path),
+            WATCH_MASK,
+        )
+        if watch_descriptor < 0:
+            os.close(self.inotify_fd)
+            raise OSError(ctypes.get_errno(), f"Cannot watch {path}")
+
+    async def wait_for_change(self: Self) -> None:
+        """Wait for inotify events and drain them."""
+        loop = asyncio.get_running_loop()
+        has_events = asyncio.Event()
+
+        loop.add_reader(self.inotify_fd, has_events.set)
+        try:
+            await has_events.wait()
+        finally:
+            loop.remove_reader(self.inotify_fd)
+
+        await asyncio.sleep(DEBOUNCE_SECONDS)
+        self._drain_events()
+
+    def close(self: Self) -> None:
+        """Close inotify file descriptor."""
+        os.close(self.inotify_fd)
+
+    def _drain_events(self: Self) -> None:
+        """Read all pending events, their content doesn't matter."""
+        while True:
+            try:
+                if not os.read(self.inotify_fd, 4096):
+                    return
+            except BlockingIOError:
+                return
+
+
+class PollingFileWatcher(FileWatcher):
+    """Watcher that polls modification time of the files."""
+
+    def __init__(self: Self, path: str, poll_interval: float) -> None:
+        """Initialize new polling watcher.
+
+        ### Parameters:
+        - `path`: directory to watch.
+        - `poll_interval`: interval between checks in seconds.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.last_state = self._directory_state()
+
+    async def wait_for_change(self: Self) -> None:
+        """Poll the directory until its state changes."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current_state = self._directory_state()
+            if current_state != self.last_state:
+                self.last_state = current_state
+                return
+
+    def close(self: Self) -> None:
+        """Nothing to release for polling watcher."""
+
+    def _directory_state(self: Self) -> dict[str, tuple[int, int]]:
+        """Collect modification time and size of every file."""
+        directory_state = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    directory_state[entry.name] = (
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                    )
+        return directory_state
+
+
+def build_watcher(path: str, poll_interval: float) -> FileWatcher:
+    """Build the best available watcher for the platform.
+
+    `inotify` is used on Linux, polling is used
+    everywhere else or if `inotify` is unavailable.
+
+    ### Parameters:
+    - `path`: directory to watch.
+    - `poll_interval`: interval between checks for polling watcher.
+
+    ### Returns:
+    new `FileWatcher`.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyFileWatcher(path=path)
+        except (OSError, AttributeError):
+            pass
+
+    return PollingFileWatcher(path=path, poll_interval=poll_interval)
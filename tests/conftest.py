@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from m3p0.app_config import ApplicationConfig
+
+
+# Database from this variable is wiped before every database test.
+TEST_DATABASE_URL_ENV = "M3P0_TEST_PSQL_URL"
+
+
+@pytest.fixture
+def migration_path(tmp_path: Path) -> Path:
+    path = tmp_path / "migrations"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def write_migration(migration_path: Path) -> Callable[..., str]:
+    """Factory writing new migration on top of the previous one."""
+    revisions: list[str] = []
+
+    def _write_migration(
+        apply_sql: str,
+        rollback_sql: str = "",
+        apply_in_transaction: bool = True,
+        rollback_in_transaction: bool = True,
+        partitioned: dict[str, Any] | None = None,
+        extra_files: dict[str, str] | None = None,
+    ) -> str:
+        revision = uuid.uuid4().hex
+        path = migration_path / f"{len(revisions):04}_migration"
+        path.mkdir()
+        (path / "apply.sql").write_text(apply_sql)
+        (path / "rollback.sql").write_text(rollback_sql)
+        for file_name, content in (extra_files or {}).items():
+            (path / file_name).write_text(content)
+
+        specification: dict[str, Any] = {
+            "revision": revision,
+            "back_revision": revisions[-1] if revisions else None,
+            "apply_in_transaction": apply_in_transaction,
+            "rollback_in_transaction": rollback_in_transaction,
+        }
+        if partitioned:
+            specification["partitioned"] = partitioned
+        (path / "specification.json").write_text(json.dumps(specification))
+
+        revisions.append(revision)
+        return revision
+
+    return _write_migration
+
+
+@pytest.fixture
+def database_url() -> str:
+    url = os.getenv(TEST_DATABASE_URL_ENV)
+    if not url:
+        pytest.skip(f"{TEST_DATABASE_URL_ENV} is not set")
+    return url
+
+
+@pytest.fixture
+def config(migration_path: Path, database_url: str) -> ApplicationConfig:
+    """Config for the clean and initialized test database."""
+    from m3p0.commands.init_cmd import InitCommand
+    from m3p0.driver import PSQLPyM3P0Driver
+
+    test_config = ApplicationConfig(
+        migration_path=str(migration_path),
+        postgres_url=database_url,
+    )
+
+    async def prepare_database() -> None:
+        driver = PSQLPyM3P0Driver(config=test_config)
+        await driver.execute_migration(
+            querystring="DROP SCHEMA public CASCADE; CREATE SCHEMA public;",
+        )
+        await InitCommand(config=test_config, driver=driver).run()
+        driver.conn_pool.close()
+
+    asyncio.run(prepare_database())
+    return test_config
@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, Callable
+
+import pytest
+from psqlpy import ConnectionPool
+
+import m3p0
+from m3p0 import api
+from m3p0.app_config import ApplicationConfig
+from m3p0.driver import PSQLPyM3P0Driver
+from m3p0.exceptions import CommandError
+
+
+class TrackedDriver(PSQLPyM3P0Driver):
+    """Driver remembering every instance built by the API."""
+
+    instances: list["TrackedDriver"] = []
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+def test_init_and_apply_on_fresh_database(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    write_migration(apply_sql="CREATE TABLE items (id INT);")
+    write_migration(
+        apply_sql="CREATE INDEX CONCURRENTLY items_id_idx ON items (id);",
+        apply_in_transaction=False,
+    )
+    monkeypatch.setattr(TrackedDriver, "instances", [])
+    monkeypatch.setattr(api, "PSQLPyM3P0Driver", TrackedDriver)
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        await driver.execute_migration(
+            querystring="DROP SCHEMA public CASCADE; CREATE SCHEMA public;",
+        )
+
+        await m3p0.init(config=config)
+        report = await m3p0.apply(config=config, force_no_version=True)
+
+        assert "2 migrations applied" in report
+        assert await driver.fetch_val(
+            "SELECT to_regclass('items_id_idx') IS NOT NULL",
+        )
+        # Pools created by the API are closed after every call.
+        assert len(TrackedDriver.instances) == 2
+        for tracked_driver in TrackedDriver.instances:
+            assert tracked_driver.conn_pool.status().max_size == 0
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_apply_keeps_application_pool(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql="CREATE TABLE items (id INT);")
+    write_migration(apply_sql="INSERT INTO missing VALUES (1);")
+
+    async def scenario() -> None:
+        conn_pool = ConnectionPool(dsn=config.postgres_url, max_db_pool_size=4)
+
+        with pytest.raises(CommandError):
+            await m3p0.apply(
+                config=config,
+                conn_pool=conn_pool,
+                force_no_version=True,
+            )
+
+        async with conn_pool.acquire() as conn:
+            assert await conn.fetch_val(
+                "SELECT to_regclass('items') IS NOT NULL",
+                prepared=False,
+            )
+        conn_pool.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,187 @@
+import asyncio
+import uuid
+from typing import Callable
+
+from psqlpy import ConnectionPool
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import BaseCommandResult, FailCommandResult, SuccessCommandResult
+from m3p0.driver import PSQLPyM3P0Driver
+
+
+async def apply(
+    config: ApplicationConfig,
+    driver: PSQLPyM3P0Driver,
+) -> BaseCommandResult:
+    return await ApplyCommand(
+        config=config,
+        driver=driver,
+        version=None,
+        force_no_version=True,
+    ).run()
+
+
+def test_non_transactional_statements_are_executed(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql="CREATE TABLE items (id INT);")
+    revision = write_migration(
+        apply_sql=(
+            "CREATE INDEX CONCURRENTLY items_id_idx ON items (id);\n"
+            "INSERT INTO items VALUES (1);"
+        ),
+        apply_in_transaction=False,
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        result = await apply(config=config, driver=driver)
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        assert await driver.fetch_val(
+            "SELECT to_regclass('items_id_idx') IS NOT NULL",
+        )
+        assert await driver.fetch_val("SELECT count(*) FROM items") == 1
+        assert await driver.fetch_val(
+            "SELECT count(*) FROM M3P0_migrations WHERE revision = $1",
+            [uuid.UUID(revision)],
+        ) == 1
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_non_transactional_migration_resumes_after_failure(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql=(
+            "CREATE TABLE items (id INT);\n"
+            "INSERT INTO items VALUES (1);\n"
+            "INSERT INTO missing VALUES (1);\n"
+            "INSERT INTO items VALUES (2);"
+        ),
+        apply_in_transaction=False,
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        failed_result = await apply(config=config, driver=driver)
+        assert isinstance(failed_result, FailCommandResult)
+        assert "offset" in failed_result.message
+
+        await driver.execute("CREATE TABLE missing (id INT)")
+        result = await apply(config=config, driver=driver)
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        assert await driver.fetch_val("SELECT count(*) FROM items") == 2
+        assert await driver.fetch_val("SELECT count(*) FROM missing") == 1
+        assert await driver.fetch_val(
+            "SELECT count(*) FROM M3P0_statement_progress",
+        ) == 0
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_settings_apply_to_statements_after_resume(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql=(
+            "CREATE TABLE settings (value TEXT);\n"
+            "SET lock_timeout = '1234ms';\n"
+            "INSERT INTO settings VALUES (current_setting('lock_timeout'));\n"
+            "INSERT INTO missing VALUES (1);\n"
+            "INSERT INTO settings VALUES (current_setting('lock_timeout'));"
+        ),
+        apply_in_transaction=False,
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        failed_result = await apply(config=config, driver=driver)
+        assert isinstance(failed_result, FailCommandResult)
+        await driver.execute("CREATE TABLE missing (id INT)")
+        driver.conn_pool.close()
+
+        # Next apply runs on new connections, like a new process does.
+        driver = PSQLPyM3P0Driver(config=config)
+        result = await apply(config=config, driver=driver)
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        settings = await driver.fetch("SELECT value FROM settings")
+        assert [record["value"] for record in settings or []] == [
+            "1234ms",
+            "1234ms",
+        ]
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_transactional_migration_is_not_recorded(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql="CREATE TABLE items (id INT);")
+    write_migration(
+        apply_sql=(
+            "CREATE TABLE other (id INT);\n"
+            "INSERT INTO missing VALUES (1);"
+        ),
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        result = await apply(config=config, driver=driver)
+
+        assert isinstance(result, FailCommandResult)
+        assert await driver.fetch_val(
+            "SELECT count(*) FROM M3P0_migrations",
+        ) == 1
+        assert not await driver.fetch_val(
+            "SELECT to_regclass('other') IS NOT NULL",
+        )
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_too_small_for_apply_fails(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql="CREATE TABLE items (id INT);")
+
+    async def scenario() -> None:
+        config_driver = PSQLPyM3P0Driver(config=config)
+        assert config_driver.max_sessions() == config.pool_size
+        config_driver.conn_pool.close()
+
+        driver = PSQLPyM3P0Driver(
+            conn_pool=ConnectionPool(
+                dsn=config.postgres_url,
+                max_db_pool_size=2,
+            ),
+        )
+        result = await ApplyCommand(
+            config=config,
+            driver=driver,
+            version=None,
+            force_no_version=True,
+            lock_monitor=True,
+        ).run()
+
+        assert isinstance(result, FailCommandResult)
+        assert "pool_size" in result.message
+        assert not await driver.fetch_val(
+            "SELECT to_regclass('items') IS NOT NULL",
+        )
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
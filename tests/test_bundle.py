@@ -0,0 +1,109 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.bundle import BUNDLE_HEADER, MigrationBundle, build_bundle
+from m3p0.commands.base import FailCommandResult, SuccessCommandResult
+from m3p0.commands.bundle_cmd import VerifyBundleCommand
+from m3p0.exceptions import BundleError
+from m3p0.utils import directory_migrations, sorted_migrations
+
+
+@pytest.fixture
+def bundle_config(
+    tmp_path: Path,
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> ApplicationConfig:
+    write_migration(apply_sql="CREATE TABLE a (id INT);")
+    write_migration(
+        apply_sql="CREATE INDEX CONCURRENTLY ON a (id);",
+        apply_in_transaction=False,
+    )
+    bundle_config = ApplicationConfig(
+        migration_path=str(migration_path),
+        bundle_path=str(tmp_path / "migrations.bundle"),
+    )
+    build_bundle(
+        migrations=directory_migrations(config=bundle_config),
+        output_path=str(bundle_config.bundle_path),
+    )
+    return bundle_config
+
+
+def test_bundle_round_trip(bundle_config: ApplicationConfig) -> None:
+    local_migrations = directory_migrations(config=bundle_config)
+    bundle = MigrationBundle(path=str(bundle_config.bundle_path))
+
+    bundle.verify()
+    assert [migration.spec for migration in bundle.migrations] == [
+        migration.spec for migration in local_migrations
+    ]
+    assert [
+        migration.read_sql("apply.sql") for migration in bundle.migrations
+    ] == [
+        migration.read_sql("apply.sql") for migration in local_migrations
+    ]
+
+
+def test_bundle_verify_covers_index(bundle_config: ApplicationConfig) -> None:
+    bundle_path = Path(str(bundle_config.bundle_path))
+    content = bundle_path.read_bytes()
+    # Same length, so offsets stay valid and only the digest can catch it.
+    corrupted = content.replace(
+        b'"apply_in_transaction": false',
+        b'"apply_in_transaction": true ',
+    )
+    assert corrupted != content
+    bundle_path.write_bytes(corrupted)
+
+    bundle = MigrationBundle(path=str(bundle_path))
+    assert json.loads(
+        corrupted[BUNDLE_HEADER.size:bundle.data_offset],
+    ) == bundle.index
+    with pytest.raises(BundleError):
+        bundle.verify()
+
+
+def test_empty_bundle(tmp_path: Path) -> None:
+    bundle_path = tmp_path / "empty.bundle"
+    bundle_path.write_bytes(b"")
+
+    with pytest.raises(BundleError):
+        MigrationBundle(path=str(bundle_path))
+
+
+def test_bundle_is_used_without_directory(
+    bundle_config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql="DROP TABLE a;")
+
+    assert len(sorted_migrations(config=bundle_config)) == 2
+
+
+def test_verify_finds_stale_bundle(
+    bundle_config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    verify_command = VerifyBundleCommand(
+        config=bundle_config,
+        bundle_path=str(bundle_config.bundle_path),
+    )
+    result = asyncio.run(verify_command.execute_cmd())
+    assert isinstance(result, SuccessCommandResult), result.message
+
+    head_migration = directory_migrations(config=bundle_config)[-1]
+    (Path(head_migration.path) / "apply.sql").write_text(
+        "CREATE INDEX CONCURRENTLY ON a (id, id);",
+    )
+    new_revision = write_migration(apply_sql="DROP TABLE a;")
+
+    result = asyncio.run(verify_command.execute_cmd())
+    assert isinstance(result, FailCommandResult)
+    assert f"{head_migration.spec.revision} apply.sql differs" in result.message
+    assert f"{new_revision} is missing in the bundle" in result.message
@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+from uuid import UUID
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import BaseCommandResult, FailCommandResult, SuccessCommandResult
+from m3p0.queries import (
+    INSERT_APPLIED_MIGRATION,
+    IS_REVISION_APPLIED,
+    RETRIEVE_SORTED_REVISIONS,
+)
+
+
+class FakeDatabase:
+    """State shared by drivers of different processes."""
+
+    def __init__(self) -> None:
+        self.applied_revisions: list[UUID] = []
+        self.executed_migrations: list[str] = []
+        self.lock_holder: object | None = None
+
+
+class FakeLockingDriver:
+    """Driver of one process applying migrations."""
+
+    def __init__(self, database: FakeDatabase) -> None:
+        self.database = database
+
+    async def exists(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> bool:
+        assert querystring == IS_REVISION_APPLIED
+        assert parameters
+        return parameters[0] in self.database.applied_revisions
+
+    async def fetch(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> list[dict[str, Any]] | None:
+        assert querystring == RETRIEVE_SORTED_REVISIONS
+        return [
+            {"id": id, "version": None, "revision": revision, "is_applied": True}
+            for id, revision in enumerate(self.database.applied_revisions)
+        ] or None
+
+    async def fetch_val(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> Any:
+        raise NotImplementedError
+
+    async def execute(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> None:
+        assert querystring == INSERT_APPLIED_MIGRATION
+        assert parameters
+        self.database.applied_revisions.append(parameters[1])
+
+    async def execute_migration(
+        self,
+        querystring: str,
+        in_transaction: bool = True,
+    ) -> None:
+        self.database.executed_migrations.append(querystring)
+
+    @contextlib.asynccontextmanager
+    async def try_advisory_lock(self, lock_name: str) -> AsyncIterator[bool]:
+        is_locked = self.database.lock_holder is None
+        if is_locked:
+            self.database.lock_holder = self
+        try:
+            yield is_locked
+        finally:
+            if is_locked:
+                self.database.lock_holder = None
+
+
+def apply(
+    migration_path: Path,
+    database: FakeDatabase,
+    other_process: Callable[[], Any] | None = None,
+) -> BaseCommandResult:
+    """Apply migrations while another process runs concurrently."""
+    config = ApplicationConfig(
+        migration_path=str(migration_path),
+        apply_lock_timeout=0.5,
+    )
+
+    async def scenario() -> BaseCommandResult:
+        other_task = (
+            asyncio.create_task(other_process()) if other_process else None
+        )
+        result = await ApplyCommand(
+            config=config,
+            driver=FakeLockingDriver(database),
+            version=None,
+            force_no_version=True,
+        ).run()
+        if other_task:
+            await other_task
+        return result
+
+    return asyncio.run(scenario())
+
+
+def test_leader_applies_migrations(
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> None:
+    revision = write_migration(apply_sql="CREATE TABLE items (id INT);")
+    database = FakeDatabase()
+
+    result = apply(migration_path=migration_path, database=database)
+
+    assert isinstance(result, SuccessCommandResult), result.message
+    assert database.applied_revisions == [UUID(revision)]
+    assert len(database.executed_migrations) == 1
+    assert database.lock_holder is None
+
+
+def test_waiter_succeeds_when_head_is_applied(
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> None:
+    revision = write_migration(apply_sql="CREATE TABLE items (id INT);")
+    database = FakeDatabase()
+    database.lock_holder = object()
+
+    async def leader() -> None:
+        await asyncio.sleep(0.15)
+        database.applied_revisions.append(UUID(revision))
+        database.lock_holder = None
+
+    result = apply(
+        migration_path=migration_path,
+        database=database,
+        other_process=leader,
+    )
+
+    assert isinstance(result, SuccessCommandResult), result.message
+    assert "applied by another process" in result.message
+    assert not database.executed_migrations
+
+
+def test_waiter_times_out(
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql="CREATE TABLE items (id INT);")
+    database = FakeDatabase()
+    database.lock_holder = object()
+
+    result = apply(migration_path=migration_path, database=database)
+
+    assert isinstance(result, FailCommandResult)
+    assert "Timed out" in result.message
+    assert not database.executed_migrations
+
+
+def test_waiter_takes_over_released_lock(
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> None:
+    revision = write_migration(apply_sql="CREATE TABLE items (id INT);")
+    database = FakeDatabase()
+    database.lock_holder = object()
+
+    async def failed_leader() -> None:
+        await asyncio.sleep(0.15)
+        database.lock_holder = None
+
+    result = apply(
+        migration_path=migration_path,
+        database=database,
+        other_process=failed_leader,
+    )
+
+    assert isinstance(result, SuccessCommandResult), result.message
+    assert database.applied_revisions == [UUID(revision)]
+    assert len(database.executed_migrations) == 1
@@ -0,0 +1,124 @@
+import asyncio
+import dataclasses
+from typing import Any, Callable
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import SuccessCommandResult
+from m3p0.driver import PSQLPyM3P0Driver
+from m3p0.monitor import LockMonitor, migration_tag
+
+
+class BlockingSessionsDriver:
+    """Driver returning two migration backends blocking sessions."""
+
+    def __init__(self) -> None:
+        self.cancelled_pids: list[int] = []
+
+    async def fetch(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> list[dict[str, Any]] | None:
+        return [
+            {
+                "migration_pid": 10,
+                "blocked_pid": 11,
+                "blocked_query": "SELECT 11",
+                "blocked_ms": 50,
+            },
+            {
+                "migration_pid": 20,
+                "blocked_pid": 21,
+                "blocked_query": "SELECT 21",
+                "blocked_ms": 500,
+            },
+            {
+                "migration_pid": 30,
+                "blocked_pid": None,
+                "blocked_query": None,
+                "blocked_ms": None,
+            },
+        ]
+
+    async def fetch_val(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> Any:
+        assert parameters
+        self.cancelled_pids.append(parameters[0])
+        return True
+
+
+def test_monitor_cancels_only_blocking_backend() -> None:
+    driver = BlockingSessionsDriver()
+
+    async def scenario() -> LockMonitor:
+        async with LockMonitor(
+            driver=driver,  # type: ignore[arg-type]
+            tag=migration_tag("revision"),
+            interval_ms=10,
+            max_blocked_sessions=None,
+            max_blocked_ms=200,
+        ) as lock_monitor:
+            await asyncio.sleep(0.1)
+        return lock_monitor
+
+    lock_monitor = asyncio.run(scenario())
+
+    assert driver.cancelled_pids == [20]
+    assert lock_monitor.report.samples_number > 1
+    assert lock_monitor.report.max_blocked_ms == 500
+    assert lock_monitor.report.cancel_reason
+    assert "backend 20" in lock_monitor.report.cancel_reason
+    assert "SELECT 21" in lock_monitor.report.cancel_reason
+    assert "SELECT 11" not in lock_monitor.report.cancel_reason
+
+    summary = lock_monitor.report.summary()
+    assert "backend 10 blocks 1 sessions\n    [11, 50 ms] SELECT 11" in summary
+    assert "backend 20 blocks 1 sessions\n    [21, 500 ms] SELECT 21" in summary
+
+
+def test_blocking_time_starts_with_lock_wait(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql=(
+            "LOCK TABLE items IN ACCESS EXCLUSIVE MODE;\n"
+            "SELECT pg_sleep(0.8);"
+        ),
+    )
+    monitor_config = dataclasses.replace(config, lock_monitor_interval_ms=50)
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=monitor_config)
+        await driver.execute("CREATE TABLE items (id INT)")
+        # Query starts long before it waits for the migration lock.
+        blocked_task = asyncio.create_task(
+            driver.execute(
+                "DO $$ BEGIN "
+                "PERFORM pg_sleep(0.6); PERFORM count(*) FROM items; "
+                "END $$",
+            ),
+        )
+        await asyncio.sleep(0.1)
+
+        result = await ApplyCommand(
+            config=monitor_config,
+            driver=driver,
+            version=None,
+            force_no_version=True,
+            lock_monitor=True,
+            max_blocked_ms=500,
+        ).run()
+        await blocked_task
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        # Samples are taken while the migration statement runs.
+        assert "blocks 1 sessions" in result.message
+        assert "PERFORM count(*) FROM items" in result.message
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
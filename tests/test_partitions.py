@@ -0,0 +1,187 @@
+import asyncio
+import time
+from typing import Callable
+
+from psqlpy import ConnectionPool
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import BaseCommandResult, FailCommandResult, SuccessCommandResult
+from m3p0.driver import PSQLPyM3P0Driver
+
+
+CREATE_PARTITIONED_TABLE = """
+CREATE TABLE events (id INT, kind INT) PARTITION BY RANGE (id);
+CREATE TABLE events_1 PARTITION OF events FOR VALUES FROM (0) TO (10);
+CREATE TABLE events_2 PARTITION OF events FOR VALUES FROM (10) TO (20);
+CREATE TABLE events_3 PARTITION OF events
+    FOR VALUES FROM (20) TO (30) PARTITION BY LIST (kind);
+CREATE TABLE events_3_a PARTITION OF events_3 FOR VALUES IN (1);
+CREATE TABLE events_3_b PARTITION OF events_3 FOR VALUES IN (2);
+"""
+
+
+async def apply(
+    config: ApplicationConfig,
+    driver: PSQLPyM3P0Driver,
+) -> BaseCommandResult:
+    return await ApplyCommand(
+        config=config,
+        driver=driver,
+        version=None,
+        force_no_version=True,
+    ).run()
+
+
+def test_template_runs_on_every_leaf_partition(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(apply_sql=CREATE_PARTITIONED_TABLE)
+    write_migration(
+        apply_sql="CREATE INDEX events_id_idx ON ONLY events (id);",
+        partitioned={
+            "parent_table": "events",
+            "template_file": "partition.sql",
+            "finalize_file": "finalize.sql",
+            "concurrency": 2,
+        },
+        extra_files={
+            "partition.sql": "CREATE INDEX CONCURRENTLY ON {partition} (id);",
+            "finalize.sql": "CREATE TABLE finalized (id INT);",
+        },
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        result = await apply(config=config, driver=driver)
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        indexed_partitions = await driver.fetch(
+            "SELECT tablename::text AS tablename FROM pg_indexes "
+            "WHERE tablename LIKE 'events\\_%' ORDER BY 1",
+        )
+        assert [
+            record["tablename"] for record in indexed_partitions or []
+        ] == ["events_1", "events_2", "events_3_a", "events_3_b"]
+        assert await driver.fetch_val(
+            "SELECT to_regclass('finalized') IS NOT NULL",
+        )
+        assert await driver.fetch_val(
+            "SELECT count(*) FROM M3P0_partition_progress",
+        ) == 0
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_in_flight_partitions_are_recorded_after_failure(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql=CREATE_PARTITIONED_TABLE + "CREATE TABLE touched (name TEXT);",
+    )
+    write_migration(
+        apply_sql="SELECT 1;",
+        partitioned={
+            "parent_table": "events",
+            "template_file": "partition.sql",
+            "concurrency": 4,
+        },
+        extra_files={
+            "partition.sql": (
+                "SELECT pg_sleep(\n"
+                "    CASE WHEN '{partition}' = 'public.events_1' THEN 1 ELSE 0 END\n"
+                ");\n"
+                "SELECT 1 / (\n"
+                "    CASE WHEN '{partition}' = 'public.events_2' THEN 0 ELSE 1 END\n"
+                ");\n"
+                "INSERT INTO touched VALUES ('{partition}');"
+            ),
+        },
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        result = await apply(config=config, driver=driver)
+
+        assert isinstance(result, FailCommandResult)
+        assert "public.events_2" in result.message
+        recorded_partitions = await driver.fetch(
+            "SELECT partition_name FROM M3P0_partition_progress",
+        )
+        assert "public.events_1" in {
+            record["partition_name"] for record in recorded_partitions or []
+        }
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def write_sleeping_partitions(write_migration: Callable[..., str]) -> None:
+    write_migration(
+        apply_sql=(
+            "CREATE TABLE events (id INT) PARTITION BY RANGE (id);\n"
+            "CREATE TABLE events_1 PARTITION OF events "
+            "FOR VALUES FROM (0) TO (10);\n"
+            "CREATE TABLE events_2 PARTITION OF events "
+            "FOR VALUES FROM (10) TO (20);"
+        ),
+    )
+    write_migration(
+        apply_sql="SELECT 1;",
+        partitioned={
+            "parent_table": "events",
+            "template_file": "partition.sql",
+            "concurrency": 2,
+        },
+        extra_files={"partition.sql": "SELECT pg_sleep(0.5), '{partition}';"},
+    )
+
+
+def test_partitions_run_in_parallel(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_sleeping_partitions(write_migration)
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        start_time = time.perf_counter()
+        result = await apply(config=config, driver=driver)
+        elapsed = time.perf_counter() - start_time
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        assert elapsed < 0.9
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_partition_concurrency_is_capped_by_pool(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_sleeping_partitions(write_migration)
+
+    async def scenario() -> None:
+        # Leader lock holds one connection, one is left for partitions.
+        driver = PSQLPyM3P0Driver(
+            conn_pool=ConnectionPool(
+                dsn=config.postgres_url,
+                max_db_pool_size=2,
+            ),
+        )
+        start_time = time.perf_counter()
+        result = await asyncio.wait_for(
+            apply(config=config, driver=driver),
+            timeout=5,
+        )
+        elapsed = time.perf_counter() - start_time
+
+        assert isinstance(result, SuccessCommandResult), result.message
+        assert elapsed >= 1
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
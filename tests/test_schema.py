@@ -0,0 +1,64 @@
+import asyncio
+from pathlib import Path
+from typing import Callable
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.base import FailCommandResult, SuccessCommandResult
+from m3p0.commands.schema_cmd import SchemaDiffCommand, SchemaSnapshotCommand
+from m3p0.consts import SCHEMA_SNAPSHOT_FILE_NAME
+from m3p0.driver import PSQLPyM3P0Driver
+
+
+def test_schema_snapshot_and_diff(
+    config: ApplicationConfig,
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql=(
+            "CREATE SEQUENCE item_numbers;\n"
+            "CREATE TABLE items (\n"
+            "    id INT PRIMARY KEY,\n"
+            "    name TEXT NOT NULL DEFAULT 'item'\n"
+            ");\n"
+            "CREATE INDEX items_name_idx ON items (name);\n"
+            "CREATE FUNCTION item_count() RETURNS BIGINT\n"
+            "LANGUAGE sql AS $$ SELECT count(*) FROM items $$;"
+        ),
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        await ApplyCommand(
+            config=config,
+            driver=driver,
+            version=None,
+            force_no_version=True,
+        ).run()
+
+        snapshot_result = await SchemaSnapshotCommand(
+            config=config,
+            driver=driver,
+        ).run()
+        assert isinstance(snapshot_result, SuccessCommandResult), (
+            snapshot_result.message
+        )
+        snapshot_paths = list(migration_path.glob(f"*/{SCHEMA_SNAPSHOT_FILE_NAME}"))
+        assert len(snapshot_paths) == 1
+        assert "public.items_name_idx" in snapshot_paths[0].read_text()
+
+        diff_result = await SchemaDiffCommand(config=config, driver=driver).run()
+        assert isinstance(diff_result, SuccessCommandResult), (
+            diff_result.message
+        )
+
+        await driver.execute("ALTER TABLE items ADD COLUMN price INT")
+        await driver.execute("DROP INDEX items_name_idx")
+        drift_result = await SchemaDiffCommand(config=config, driver=driver).run()
+        assert isinstance(drift_result, FailCommandResult)
+        assert "public.items.columns.price" in drift_result.message
+        assert "indexes public.items_name_idx" in drift_result.message
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,150 @@
+import pytest
+
+from m3p0.sql import split_statements
+
+
+def statement_texts(querystring: str) -> list[str]:
+    return [statement.text for statement in split_statements(querystring)]
+
+
+def test_simple_statements() -> None:
+    assert statement_texts("SELECT 1; SELECT 2;\nSELECT 3") == [
+        "SELECT 1",
+        "SELECT 2",
+        "SELECT 3",
+    ]
+
+
+def test_offsets_point_to_statements() -> None:
+    querystring = "SELECT 1;\n\n  SELECT 2;"
+    statements = split_statements(querystring)
+
+    assert [statement.offset for statement in statements] == [0, 13]
+    for statement in statements:
+        assert querystring[statement.offset:].startswith(statement.text)
+
+
+@pytest.mark.parametrize(
+    ("querystring", "expected"),
+    [
+        (
+            "INSERT INTO t VALUES ('a;b')",
+            ["INSERT INTO t VALUES ('a;b')"],
+        ),
+        (
+            "INSERT INTO t VALUES ('it''s; fine')",
+            ["INSERT INTO t VALUES ('it''s; fine')"],
+        ),
+        (
+            "INSERT INTO t VALUES (E'it\\'s; fine')",
+            ["INSERT INTO t VALUES (E'it\\'s; fine')"],
+        ),
+        (
+            "INSERT INTO t VALUES (e'\\\\'); SELECT 'x;'",
+            ["INSERT INTO t VALUES (e'\\\\')", "SELECT 'x;'"],
+        ),
+        (
+            'SELECT 1 AS "we;ird"',
+            ['SELECT 1 AS "we;ird"'],
+        ),
+        (
+            'SELECT 1 AS "we""ird;"',
+            ['SELECT 1 AS "we""ird;"'],
+        ),
+    ],
+)
+def test_quotes(querystring: str, expected: list[str]) -> None:
+    assert statement_texts(querystring) == expected
+
+
+def test_e_is_escape_prefix_only_as_separate_word() -> None:
+    assert statement_texts("SELECT 1 WHERE x LIKE'a\\'; SELECT 2") == [
+        "SELECT 1 WHERE x LIKE'a\\'",
+        "SELECT 2",
+    ]
+
+
+def test_comments() -> None:
+    querystring = (
+        "-- comment; with semicolon\n"
+        "SELECT 1; /* block; /* nested; */ still comment; */ SELECT 2;\n"
+        "-- only comment;\n"
+    )
+
+    assert statement_texts(querystring) == [
+        "-- comment; with semicolon\nSELECT 1",
+        "/* block; /* nested; */ still comment; */ SELECT 2",
+    ]
+
+
+def test_dollar_quotes() -> None:
+    querystring = (
+        "CREATE FUNCTION f() RETURNS INT AS $$ SELECT 1; $$ LANGUAGE sql;\n"
+        "DO $body$ BEGIN PERFORM 1; END $body$;\n"
+        "SELECT $1, a$b FROM t"
+    )
+
+    assert statement_texts(querystring) == [
+        "CREATE FUNCTION f() RETURNS INT AS $$ SELECT 1; $$ LANGUAGE sql",
+        "DO $body$ BEGIN PERFORM 1; END $body$",
+        "SELECT $1, a$b FROM t",
+    ]
+
+
+def test_begin_atomic() -> None:
+    querystring = (
+        "CREATE FUNCTION f() RETURNS INT LANGUAGE sql\n"
+        "BEGIN ATOMIC\n"
+        "    SELECT CASE WHEN true THEN 1 END;\n"
+        "    SELECT 2;\n"
+        "END;\n"
+        "SELECT f();"
+    )
+
+    assert statement_texts(querystring) == [
+        "CREATE FUNCTION f() RETURNS INT LANGUAGE sql\n"
+        "BEGIN ATOMIC\n"
+        "    SELECT CASE WHEN true THEN 1 END;\n"
+        "    SELECT 2;\n"
+        "END",
+        "SELECT f()",
+    ]
+
+
+def test_transaction_begin_splits() -> None:
+    assert statement_texts("BEGIN; SELECT 1; END;") == [
+        "BEGIN",
+        "SELECT 1",
+        "END",
+    ]
+
+
+def test_parentheses() -> None:
+    querystring = (
+        "CREATE RULE r AS ON INSERT TO t DO ALSO "
+        "(INSERT INTO a VALUES (1); INSERT INTO b VALUES (2));\n"
+        "SELECT ')';"
+    )
+
+    assert statement_texts(querystring) == [
+        "CREATE RULE r AS ON INSERT TO t DO ALSO "
+        "(INSERT INTO a VALUES (1); INSERT INTO b VALUES (2))",
+        "SELECT ')'",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("querystring", "is_session_setting"),
+    [
+        ("SET lock_timeout = '1s'", True),
+        ("reset statement_timeout", True),
+        ("-- timeout\n/* for index */ SET lock_timeout = '1s'", True),
+        ("SELECT set_config('lock_timeout', '1s', false)", False),
+        ("UPDATE t SET a = 1", False),
+        ("SETOF", False),
+    ],
+)
+def test_session_setting(querystring: str, is_session_setting: bool) -> None:
+    (statement,) = split_statements(querystring)
+
+    assert statement.is_session_setting is is_session_setting
@@ -0,0 +1,142 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Callable
+
+from m3p0.app_config import ApplicationConfig
+from m3p0.commands.apply_cmd import ApplyCommand
+from m3p0.commands.watch_cmd import WatchCommand
+from m3p0.driver import PSQLPyM3P0Driver
+from m3p0.utils import directory_migrations
+
+
+def test_non_transactional_head_is_reapplied(
+    config: ApplicationConfig,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql="CREATE TABLE items (id INT);",
+        rollback_sql="DROP TABLE items;",
+        apply_in_transaction=False,
+        rollback_in_transaction=False,
+    )
+
+    async def scenario() -> None:
+        driver = PSQLPyM3P0Driver(config=config)
+        await ApplyCommand(
+            config=config,
+            driver=driver,
+            version=None,
+            force_no_version=True,
+        ).run()
+
+        head_migration = directory_migrations(config=config)[-1]
+        watch_command = WatchCommand(
+            config=config,
+            head_applied=True,
+            poll_interval=0.1,
+            driver=driver,
+        )
+        watch_command.applied_sql = head_migration.read_sql("apply.sql")
+        watch_command.applied_rollback_sql = head_migration.read_sql(
+            "rollback.sql",
+        )
+
+        new_apply_sql = "CREATE TABLE items (id INT, name TEXT);"
+        await watch_command.reapply_migration(
+            migration=head_migration,
+            apply_sql=new_apply_sql,
+        )
+
+        assert watch_command.applied_sql == new_apply_sql
+        assert await driver.fetch_val(
+            "SELECT count(*) FROM information_schema.columns "
+            "WHERE table_name = 'items'",
+        ) == 2
+        driver.conn_pool.close()
+
+    asyncio.run(scenario())
+
+
+class RecordingDriver:
+    """Driver recording executed migrations."""
+
+    def __init__(self) -> None:
+        self.executed_migrations: list[str] = []
+
+    async def exists(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> bool:
+        raise NotImplementedError
+
+    async def fetch(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> list[dict[str, Any]] | None:
+        raise NotImplementedError
+
+    async def fetch_val(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> Any:
+        raise NotImplementedError
+
+    async def execute(
+        self,
+        querystring: str,
+        parameters: list[Any] | None = None,
+    ) -> None:
+        raise NotImplementedError
+
+    async def execute_migration(
+        self,
+        querystring: str,
+        in_transaction: bool = True,
+    ) -> None:
+        self.executed_migrations.append(querystring)
+
+
+def test_fixed_rollback_is_used_on_next_change(
+    migration_path: Path,
+    write_migration: Callable[..., str],
+) -> None:
+    write_migration(
+        apply_sql="CREATE TABLE items (id INT);",
+        rollback_sql="DROP TABLE item;",
+    )
+    config = ApplicationConfig(migration_path=str(migration_path))
+    head_migration = directory_migrations(config=config)[-1]
+    driver = RecordingDriver()
+    watch_command = WatchCommand(
+        config=config,
+        head_applied=True,
+        poll_interval=0.1,
+        driver=driver,
+    )
+    watch_command.applied_sql = head_migration.read_sql("apply.sql")
+    watch_command.applied_rollback_sql = head_migration.read_sql(
+        "rollback.sql",
+    )
+
+    (Path(head_migration.path) / "rollback.sql").write_text(
+        "DROP TABLE items;",
+    )
+    asyncio.run(watch_command.handle_change(migration=head_migration))
+
+    assert not driver.executed_migrations
+    assert watch_command.applied_rollback_sql == "DROP TABLE items;"
+
+    (Path(head_migration.path) / "apply.sql").write_text(
+        "CREATE TABLE items (id INT, name TEXT);",
+    )
+    asyncio.run(watch_command.handle_change(migration=head_migration))
+
+    assert driver.executed_migrations == [
+        "DROP TABLE items;\n;\nCREATE TABLE items (id INT, name TEXT);",
+    ]
+    assert watch_command.applied_sql == (
+        "CREATE TABLE items (id INT, name TEXT);"
+    )
@@ -0,0 +1,42 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from m3p0.watcher import PollingFileWatcher
+
+
+def wait_for_change(watcher: PollingFileWatcher) -> None:
+    asyncio.run(asyncio.wait_for(watcher.wait_for_change(), timeout=1))
+
+
+def test_polling_watcher_finds_modified_file(tmp_path: Path) -> None:
+    sql_path = tmp_path / "apply.sql"
+    sql_path.write_text("SELECT 1;")
+    watcher = PollingFileWatcher(path=str(tmp_path), poll_interval=0.01)
+
+    sql_path.write_text("SELECT 22;")
+
+    wait_for_change(watcher)
+
+
+def test_polling_watcher_finds_new_file(tmp_path: Path) -> None:
+    watcher = PollingFileWatcher(path=str(tmp_path), poll_interval=0.01)
+
+    (tmp_path / "rollback.sql").write_text("SELECT 1;")
+
+    wait_for_change(watcher)
+
+
+def test_polling_watcher_waits_for_change(tmp_path: Path) -> None:
+    sql_path = tmp_path / "apply.sql"
+    sql_path.write_text("SELECT 1;")
+    watcher = PollingFileWatcher(path=str(tmp_path), poll_interval=0.01)
+    sql_path.write_text("SELECT 22;")
+    wait_for_change(watcher)
+
+    # Already reported change doesn't wake the watcher again.
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            asyncio.wait_for(watcher.wait_for_change(), timeout=0.1),
+        )